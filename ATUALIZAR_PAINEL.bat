@@ -13,17 +13,15 @@ echo ATUALIZANDO PAINEL COMERCIAL
 echo =====================================
 echo.
 
-python python\atualizar_painel_completo.py
+REM o script grava os KPIs e publica (so site\dados e dados) quando algo mudou
+python python\atualizar_painel_completo.py %*
 
-echo.
-echo =====================================
-echo ENVIANDO PARA O GITHUB
-echo =====================================
-echo.
-
-git add .
-git commit -m "Atualização automática painel"
-git push
+IF %ERRORLEVEL% NEQ 0 (
+    echo.
+    echo FALHA NA ATUALIZACAO / ENVIO DO PAINEL
+    pause
+    exit /b 1
+)
 
 echo.
 echo =====================================
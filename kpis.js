@@ -27,13 +27,47 @@ function aplicarCorPosNeg(el, valor) {
   if (valor < 0) el.classList.add("negativo");
 }
 
-Promise.all([
-  carregarJSON("kpi_faturamento.json"),
-  carregarJSON("kpi_quantidade_pedidos.json"),
-  carregarJSON("kpi_ticket_medio.json"),
-  carregarJSON("kpi_kg_total.json"),
-  carregarJSON("kpi_preco_medio.json")
-]).then(([fat, qtd, ticket, kg, preco]) => {
+/* pacote único (kpis.json) → mesmos objetos dos 5 JSONs antigos */
+function separarPacote(p) {
+  const a = p.atual, b = p.ano_anterior, v = p.variacao;
+  return [
+    {
+      atual: a.fat, ano_anterior: b.fat, variacao: v.fat,
+      inicio_mes: a.inicio, data_atual: a.fim,
+      inicio_mes_anterior: b.inicio, data_ano_anterior: b.fim
+    },
+    { atual: a.pedidos, ano_anterior: b.pedidos, variacao: v.pedidos },
+    { atual: a.ticket, ano_anterior: b.ticket, variacao: v.ticket },
+    { atual: a.kg, ano_anterior: b.kg, variacao: v.kg },
+    {
+      atual: {
+        preco_medio_kg: a.preco_kg, preco_medio_m2: a.preco_m2,
+        total_kg: a.kg, total_m2: a.m2, data: a.fim
+      },
+      ano_anterior: {
+        preco_medio_kg: b.preco_kg, preco_medio_m2: b.preco_m2,
+        total_kg: b.kg, total_m2: b.m2, data: b.fim
+      }
+    }
+  ];
+}
+
+function carregarKPIs() {
+  return carregarJSON("kpis.json").then(pacote => {
+    if (pacote && pacote.versao === 1) return separarPacote(pacote);
+
+    // painel ainda sem o pacote: formato antigo
+    return Promise.all([
+      carregarJSON("kpi_faturamento.json"),
+      carregarJSON("kpi_quantidade_pedidos.json"),
+      carregarJSON("kpi_ticket_medio.json"),
+      carregarJSON("kpi_kg_total.json"),
+      carregarJSON("kpi_preco_medio.json")
+    ]);
+  });
+}
+
+carregarKPIs().then(([fat, qtd, ticket, kg, preco]) => {
 
   if (!fat || !qtd || !ticket || !kg) return;
 
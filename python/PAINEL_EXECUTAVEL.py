@@ -1,12 +1,13 @@
 import os
 import sys
 import getpass
-import subprocess
 from datetime import datetime
 import json
 import pandas as pd
 import re
 
+import pipeline
+
 BASE_DIR = os.path.dirname(os.path.abspath(sys.executable if getattr(sys, 'frozen', False) else __file__))
 os.chdir(os.path.dirname(BASE_DIR))
 
@@ -97,12 +98,13 @@ def limpar_numero(v):
 def atualizar():
     print("Atualizando painel...")
 
-    subprocess.run(["python", "python/atualizar_painel_completo.py"])
-    subprocess.run(["python", "python/atualizar_preco_medio.py"])
+    # cálculo + publicação no mesmo processo (preço médio já sai do cálculo)
+    relatorio = pipeline.atualizar_painel(progresso=lambda etapa: print(f"→ {etapa}..."))
+    print(pipeline.formatar_relatorio(relatorio))
 
-    subprocess.run(["git", "add", "."])
-    subprocess.run(["git", "commit", "-m", "Atualização automática painel"])
-    subprocess.run(["git", "push"])
+    if not relatorio["ok"]:
+        print("Falha na atualização do painel.")
+        sys.exit(1)
 
     print("Painel atualizado com sucesso.")
 
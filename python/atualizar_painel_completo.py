@@ -1,11 +1,29 @@
 import pandas as pd
+import numpy as np
+import argparse
 import json
+import hashlib
+import math
+import multiprocessing
+import os
 import re
 import sys
-import subprocess
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
+from pandas.io.parsers import TextParser
+
+import cache_planilhas
+import instrumentacao
+import leitor_excel
+import publicador
+
 # ==========================================================
 # BASE DIR (funciona no .py e no .exe)
 # ==========================================================
@@ -25,12 +43,29 @@ def descobrir_base_dir() -> Path:
 
 BASE_DIR = descobrir_base_dir()
 
-EXCEL_2026 = BASE_DIR / "excel" / "PEDIDOS_2026.xlsx"
-EXCEL_2025 = BASE_DIR / "excel" / "PEDIDOS_2025.xlsx"
+EXCEL_DIR = BASE_DIR / "excel"
+
+# mantidos por compatibilidade — main() usa o catálogo (descobrir_planilhas)
+EXCEL_2026 = EXCEL_DIR / "PEDIDOS_2026.xlsx"
+EXCEL_2025 = EXCEL_DIR / "PEDIDOS_2025.xlsx"
 
 DADOS_DIR_1 = BASE_DIR / "dados"
 DADOS_DIR_2 = BASE_DIR / "site" / "dados"
 
+# cache das planilhas já tratadas (ver cache_planilhas.py)
+CACHE_DIR = BASE_DIR / "cache"
+CACHE_LIMITE_MB = 200
+# mude quando o tratamento de carregar_planilha mudar → invalida o cache
+VERSAO_TRATAMENTO = 7
+# medição por etapa (instrumentacao.py): liga com PAINEL_MEDIR=1 ou main(medir=True)
+MEDIR_ETAPAS = os.environ.get("PAINEL_MEDIR") == "1"
+ARQ_LOG_EXECUCOES = CACHE_DIR / "execucoes.jsonl"
+# planilha alterada → lê o Excel mas só trata as linhas novas
+INGESTAO_INCREMENTAL = True
+# motor de leitura do Excel (leitor_excel.py): "openpyxl", "calamine" ou
+# "auto" — confira com benchmark_painel.py antes de trocar
+MOTOR_EXCEL = os.environ.get("PAINEL_MOTOR_EXCEL", "openpyxl")
+
 # ==========================================================
 # UTIL
 # ==========================================================
@@ -47,6 +82,30 @@ def achar_coluna(df: pd.DataFrame, candidatos):
             return c
     return None
 
+
+# colunas que o cálculo usa → nomes aceitos no cabeçalho (já normalizado)
+COLUNAS_CANDIDATAS = {
+    "DATA": ["DATA", "DT", "DATA PEDIDO"],
+    "TIPO DE PEDIDO": ["TIPO DE PEDIDO", "TIPO"],
+    "PEDIDO": ["PEDIDO"],
+    "VALOR COM IPI": ["VALOR COM IPI"],
+    "KG": ["KG"],
+    "TOTAL M2": ["TOTAL M2", "M2"],
+}
+
+
+def colunas_necessarias(colunas) -> list:
+    """Posições das colunas que tratar_planilha vai usar (mesma escolha do achar_coluna)."""
+    normalizadas = [str(c).strip().upper() for c in colunas]
+    presentes = set(normalizadas)
+    posicoes = set()
+    for candidatos in COLUNAS_CANDIDATAS.values():
+        for c in candidatos:
+            if c in presentes:
+                posicoes.add(normalizadas.index(c))
+                break
+    return sorted(posicoes)
+
 # ==========================================================
 # CONVERSÃO NÚMEROS EXCEL
 # ==========================================================
@@ -91,29 +150,277 @@ def limpar_numero(v) -> float:
     return float(s)
 
 
+# ----------------------------------------------------------
+# limpar_numero VETORIZADO — mesmas regras, coluna inteira
+# ----------------------------------------------------------
+VAZIOS_NUMERO = ["", "-", ",", ".", ",-", ".-"]
+
+try:
+    import pyarrow  # noqa: F401
+    TEM_PYARROW = True
+except ImportError:
+    TEM_PYARROW = False
+
+
+def excel_datas_para_numero(datas: pd.DatetimeIndex) -> np.ndarray:
+    """excel_datetime_para_numero para um índice inteiro (NaT e fora de 1899-1901 → 0)."""
+    delta = datas - EXCEL_EPOCH
+    numeros = delta.days.to_numpy(dtype="float64", na_value=0.0) + (
+        delta.seconds.to_numpy(dtype="float64", na_value=0.0) / 86400
+    )
+    validas = np.asarray(datas.year.isin([1899, 1900, 1901]))
+    return np.where(validas, numeros, 0.0)
+
+
+def _limpar_textos(textos: pd.Series) -> np.ndarray:
+    """Regra de texto de limpar_numero aplicada uma vez por valor distinto."""
+    codigos, unicos = pd.factorize(textos)
+
+    if not TEM_PYARROW:
+        # sem pyarrow as operações .str do pandas são laços Python:
+        # o próprio limpar_numero por valor distinto já é o mais rápido
+        valores = np.array([limpar_numero(v) for v in unicos], dtype="float64")
+        return valores[codigos]
+
+    u = pd.Series(unicos, dtype="string[pyarrow]").str.replace(r"[^0-9,.\-]", "", regex=True)
+
+    tem_ponto = u.str.contains(".", regex=False)
+    tem_virgula = u.str.contains(",", regex=False)
+    milhar = tem_ponto & ~tem_virgula & u.str.contains(r"\.[^.]{3}$", regex=True)
+    sem_ponto = u.str.replace(".", "", regex=False)
+
+    u = u.where(~(tem_ponto & tem_virgula), sem_ponto.str.replace(",", ".", regex=False))
+    u = u.where(~(tem_virgula & ~tem_ponto), u.str.replace(",", ".", regex=False))
+    u = u.where(~milhar, sem_ponto)
+    u = u.mask(u.isin(VAZIOS_NUMERO), "0")
+
+    # float() do Python para ter exatamente o mesmo arredondamento e os
+    # mesmos erros do caminho escalar
+    valores = np.fromiter(map(float, u.to_numpy(dtype=object)), dtype="float64", count=len(u))
+    return valores[codigos]
+
+
+def _categoria_tipo(tipo) -> str:
+    if issubclass(tipo, (int, float)):
+        return "num"
+    if issubclass(tipo, (pd.Timestamp, datetime)):
+        return "data"
+    return "texto"
+
+
+def limpar_numero_serie(serie: pd.Series) -> pd.Series:
+    """
+    Equivalente a serie.apply(limpar_numero), mas por coluna:
+    números passam direto, datas viram serial Excel (1899/1900/1901)
+    e textos são tratados uma vez por valor distinto.
+    """
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+        return serie.astype("float64").fillna(0.0)
+
+    if pd.api.types.is_datetime64_dtype(serie):
+        return pd.Series(excel_datas_para_numero(pd.DatetimeIndex(serie)), index=serie.index, name=serie.name)
+
+    resultado = np.zeros(len(serie), dtype="float64")
+    nulos = serie.isna().to_numpy()
+
+    if pd.api.types.is_string_dtype(serie) and serie.dtype != object:
+        categorias = np.where(nulos, "nulo", "texto")
+        valores = serie
+        so_str = True
+    else:
+        valores = serie.astype(object)
+        tipos = valores.map(type)
+        por_tipo = {t: _categoria_tipo(t) for t in tipos.unique()}
+        categorias = tipos.map(por_tipo).to_numpy(dtype=object)
+        categorias[nulos] = "nulo"
+        # só textos "de verdade" dispensam o str() elemento a elemento
+        so_str = all(t is str for t, c in por_tipo.items() if c == "texto")
+
+    m = categorias == "num"
+    if m.any():
+        resultado[m] = valores[m].to_numpy(dtype=object).astype("float64")
+
+    m = categorias == "data"
+    if m.any():
+        datas = valores[m]
+        try:
+            resultado[m] = excel_datas_para_numero(pd.DatetimeIndex(datas.to_list()))
+        except (TypeError, ValueError):
+            # datas com fuso/misturadas: caminho escalar
+            resultado[m] = [limpar_numero(v) for v in datas]
+
+    m = categorias == "texto"
+    if m.any():
+        textos = valores[m]
+        if not so_str:
+            textos = textos.map(str)
+        resultado[m] = _limpar_textos(textos)
+
+    return pd.Series(resultado, index=serie.index, name=serie.name)
+
+
+# ==========================================================
+# CONVERSÃO DATAS — coluna DATA com tipos misturados
+# ----------------------------------------------------------
+# Linhas coladas pelo robô trazem "dd/mm/aaaa" em texto no meio das
+# datas do Excel. Cada valor vai pelo caminho do seu tipo:
+#   data    datetime/Timestamp → direto, coluna inteira
+#   serial  número → serial do Excel (dias desde 30/12/1899)
+#   texto   FORMATOS_DATA explícitos, uma vez por texto distinto
+#   memo    texto fora dos formatos → parser do pandas (dia primeiro),
+#           memorizado por texto
+#   vazia   vazio, hora sem data (linha de continuação), data fora
+#           do intervalo do pandas, outros → NaT
+# ==========================================================
+FORMATOS_DATA = ["%d/%m/%Y", "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S"]
+SERIAL_MAXIMO = 2958465      # 31/12/9999
+CAMINHOS_DATA = ["data", "serial", "texto", "memo", "vazia"]
+DATA, SERIAL, TEXTO, MEMO, VAZIA = range(len(CAMINHOS_DATA))
+# dias inteiros dentro do intervalo do datetime64[ns]
+_NS_MINIMO, _NS_MAXIMO = np.datetime64("1677-09-22"), np.datetime64("2262-04-11")
+
+
+@lru_cache(maxsize=4096)
+def _data_texto(texto: str):
+    try:
+        # ISO (aaaa-mm-dd) primeiro: com dayfirst o pandas trocaria dia e mês
+        return pd.Timestamp(datetime.fromisoformat(texto))
+    except ValueError:
+        pass
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")    # aviso de formato inferido
+            return pd.to_datetime(texto, dayfirst=True)
+    except (ValueError, OverflowError, TypeError):
+        return pd.NaT
+
+
+def _datas_ns(datas) -> np.ndarray:
+    """datetime64[ns]; o que não cabe no intervalo do pandas vira NaT."""
+    a = pd.DatetimeIndex(datas).to_numpy()
+    if a.dtype != "datetime64[ns]":
+        a = np.where((a < _NS_MINIMO) | (a > _NS_MAXIMO), np.datetime64("NaT"), a).astype("datetime64[ns]")
+    return a
+
+
+def _caminho_data(tipo) -> int:
+    if issubclass(tipo, (datetime, np.datetime64)):
+        return DATA
+    if issubclass(tipo, (bool, np.bool_)):
+        return VAZIA
+    if issubclass(tipo, (int, float, np.integer, np.floating)):
+        return SERIAL
+    if issubclass(tipo, str):
+        return TEXTO
+    return VAZIA
+
+
+def normalizar_datas(serie: pd.Series):
+    """
+    (datas, caminhos): a coluna em datetime64[ns] e quantas linhas
+    passaram por cada caminho (CAMINHOS_DATA) + "nat" (sem data no fim).
+    """
+    resultado = np.full(len(serie), np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    if pd.api.types.is_datetime64_dtype(serie):
+        resultado[:] = _datas_ns(serie)
+        categorias = np.where(serie.isna().to_numpy(), VAZIA, DATA)
+    else:
+        valores = serie.astype(object)
+        por_tipo = {}
+
+        def caminho(v):
+            t = type(v)
+            c = por_tipo.get(t)
+            if c is None:
+                c = por_tipo[t] = _caminho_data(t)
+            return c
+
+        categorias = np.fromiter(map(caminho, valores.to_numpy()), dtype="int8", count=len(valores))
+
+        m = categorias == DATA
+        if m.any():
+            resultado[m] = _datas_ns(pd.to_datetime(valores[m].to_numpy(), errors="coerce"))
+
+        m = categorias == SERIAL
+        if m.any():
+            serial = valores[m].to_numpy(dtype="float64")
+            serial[(serial < 1) | (serial > SERIAL_MAXIMO)] = np.nan   # < 1 é só hora
+            datas = pd.to_datetime(serial, unit="D", origin=pd.Timestamp(EXCEL_EPOCH))
+            resultado[m] = _datas_ns(datas.round("us"))
+
+        m = categorias == TEXTO
+        if m.any():
+            codigos, unicos = pd.factorize(valores[m].str.strip().to_numpy(dtype=object))
+            datas_unicas = np.full(len(unicos), np.datetime64("NaT"), dtype="datetime64[ns]")
+            caminho_unico = np.full(len(unicos), MEMO, dtype="int8")
+            caminho_unico[unicos == ""] = VAZIA
+
+            for formato in FORMATOS_DATA:
+                pendentes = np.flatnonzero(caminho_unico == MEMO)
+                if not len(pendentes):
+                    break
+                datas = pd.to_datetime(unicos[pendentes], format=formato, errors="coerce")
+                ok = np.asarray(datas.notna())
+                datas_unicas[pendentes[ok]] = _datas_ns(datas[ok])
+                caminho_unico[pendentes[ok]] = TEXTO
+
+            pendentes = np.flatnonzero(caminho_unico == MEMO)
+            if len(pendentes):
+                datas_unicas[pendentes] = _datas_ns([_data_texto(t) for t in unicos[pendentes]])
+
+            resultado[m] = datas_unicas[codigos]
+            categorias[m] = caminho_unico[codigos]
+
+        # NaN/NaT e datas fora do intervalo não tinham data de verdade
+        categorias[(categorias <= SERIAL) & np.isnat(resultado)] = VAZIA
+
+    contagem = np.bincount(categorias, minlength=len(CAMINHOS_DATA))
+    caminhos = {nome: int(n) for nome, n in zip(CAMINHOS_DATA, contagem)}
+    caminhos["nat"] = int(np.isnat(resultado).sum())
+    return pd.Series(resultado, index=serie.index, name=serie.name), caminhos
+
+
 # ==========================================================
 # CARREGAR PLANILHA 2025/2026
 # ==========================================================
-def carregar_planilha(caminho: Path) -> pd.DataFrame:
-    df = pd.read_excel(caminho)
-    df = normalizar_colunas(df)
+def carregar_planilha(caminho: Path, motor: str = None) -> pd.DataFrame:
+    with instrumentacao.etapa("ler_excel") as reg:
+        colunas, linhas = ler_linhas_excel(caminho, motor)
+        df = _linhas_para_df(colunas, linhas, 0)
+        reg["linhas_saida"] = len(df)
+    return tratar_planilha(df)
+
 
-    col_data = achar_coluna(df, ["DATA", "DT", "DATA PEDIDO"])
-    col_tipo = achar_coluna(df, ["TIPO DE PEDIDO", "TIPO"])
-    col_pedido = achar_coluna(df, ["PEDIDO"])
-    col_valor_ipi = achar_coluna(df, ["VALOR COM IPI"])
-    col_kg = achar_coluna(df, ["KG"])
-    col_m2 = achar_coluna(df, ["TOTAL M2", "M2"])
+def tratar_planilha(df: pd.DataFrame) -> pd.DataFrame:
+    with instrumentacao.etapa("normalizar_colunas", len(df)) as reg:
+        df = normalizar_colunas(df)
+        reg["linhas_saida"] = len(df)
 
-    df[col_data] = pd.to_datetime(df[col_data], errors="coerce", dayfirst=True)
-    df = df[df[col_data].notna()]
+    col_data = achar_coluna(df, COLUNAS_CANDIDATAS["DATA"])
+    col_tipo = achar_coluna(df, COLUNAS_CANDIDATAS["TIPO DE PEDIDO"])
+    col_pedido = achar_coluna(df, COLUNAS_CANDIDATAS["PEDIDO"])
+    col_valor_ipi = achar_coluna(df, COLUNAS_CANDIDATAS["VALOR COM IPI"])
+    col_kg = achar_coluna(df, COLUNAS_CANDIDATAS["KG"])
+    col_m2 = achar_coluna(df, COLUNAS_CANDIDATAS["TOTAL M2"])
 
-    df[col_tipo] = df[col_tipo].astype(str).str.upper()
-    df = df[df[col_tipo] == "NORMAL"]
+    with instrumentacao.etapa("datas", len(df)) as reg:
+        datas, caminhos = normalizar_datas(df[col_data])
+        df[col_data] = datas
+        df = df[df[col_data].notna()]
+        reg["caminhos"] = caminhos
+        reg["linhas_saida"] = len(df)
 
-    df[col_valor_ipi] = df[col_valor_ipi].apply(limpar_numero)
-    df[col_kg] = df[col_kg].apply(limpar_numero)
-    df[col_m2] = df[col_m2].apply(limpar_numero)
+    with instrumentacao.etapa("tipo_pedido", len(df)) as reg:
+        df[col_tipo] = df[col_tipo].astype(str).str.upper()
+        df = df[df[col_tipo] == "NORMAL"]
+        reg["linhas_saida"] = len(df)
+
+    with instrumentacao.etapa("limpar_numero", len(df)) as reg:
+        df[col_valor_ipi] = limpar_numero_serie(df[col_valor_ipi])
+        df[col_kg] = limpar_numero_serie(df[col_kg])
+        df[col_m2] = limpar_numero_serie(df[col_m2])
+        reg["linhas_saida"] = len(df)
 
     df = df.rename(columns={
         col_data: "DATA",
@@ -124,11 +431,390 @@ def carregar_planilha(caminho: Path) -> pd.DataFrame:
         col_m2: "TOTAL M2",
     })
 
+    with instrumentacao.etapa("compactar", len(df)) as reg:
+        antes = memoria_dataset(df) if instrumentacao.ligada() else None
+        df = compactar_dataset(df)
+        if antes is not None:
+            reg["memoria"] = {"antes": antes, "depois": memoria_dataset(df)}
+        reg["linhas_saida"] = len(df)
+
+    with instrumentacao.etapa("ordenar", len(df)) as reg:
+        df = ordenar_por_data(df)
+        reg["linhas_saida"] = len(df)
+    return df
+
+
+def ordenar_por_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ordena por DATA (estável: mantém a ordem da planilha dentro do dia) e
+    usa a DATA como índice, para fatiar_periodo cortar por busca binária.
+    """
+    df = df.sort_values("DATA", kind="stable")
+    df.index = pd.DatetimeIndex(df["DATA"].to_numpy())
+    return df
+
+
+# ==========================================================
+# DATASET COMPACTO — o que fica em memória (serviço, prévia)
+# ----------------------------------------------------------
+#   DATA            datetime64[ns]
+#   TIPO DE PEDIDO  category (código por linha, texto uma vez só)
+#   PEDIDO          int64 quando todos são números inteiros; senão
+#                   fica como veio (pedido com letra, por exemplo)
+#   medidas         float64 (as somas exatas dependem disso)
+# ==========================================================
+def _pedidos_inteiros(pedido: pd.Series) -> pd.Series:
+    pedido = pedido.infer_objects()
+    if pd.api.types.is_bool_dtype(pedido) or not pd.api.types.is_numeric_dtype(pedido):
+        return pedido
+    valores = pedido.to_numpy(dtype="float64", na_value=np.nan)
+    # float64 só representa inteiros exatos até 2**53
+    if not (np.isfinite(valores).all() and (np.abs(valores) < 2.0 ** 53).all()
+            and (valores == np.trunc(valores)).all()):
+        return pedido
+    return pd.Series(valores.astype("int64"), index=pedido.index, name=pedido.name)
+
+
+def compactar_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Mesmas linhas e valores com os tipos enxutos acima (pode ser chamado de novo)."""
+    df = df.copy(deep=False)
+    df["DATA"] = df["DATA"].astype("datetime64[ns]")
+    df["TIPO DE PEDIDO"] = df["TIPO DE PEDIDO"].astype("category")
+    df["PEDIDO"] = _pedidos_inteiros(df["PEDIDO"])
+    for medida in MEDIDAS:
+        df[medida] = df[medida].astype("float64")
     return df
 
 
+def memoria_dataset(df: pd.DataFrame) -> dict:
+    """{coluna: bytes} contando o conteúdo dos textos (memory_usage deep), com o índice."""
+    return {str(coluna): int(n) for coluna, n in df.memory_usage(deep=True).items()}
+
+
+def memoria_em_uso() -> dict:
+    """{arquivo: MB} dos datasets guardados em memória (ver carregar_anos)."""
+    return {
+        caminho.name: round(sum(memoria_dataset(df).values()) / 1e6, 3)
+        for caminho, (_, df) in sorted(_DATASETS.items())
+    }
+
+
 # ==========================================================
-# DEFINIR PERÍODO — usa última data real da planilha 2026
+# CARREGAR PLANILHA — modo incremental
+# ----------------------------------------------------------
+# A planilha do ano corrente só recebe linhas no fim. Guardamos no
+# cache quantas linhas brutas já foram tratadas + o hash delas; na
+# próxima leitura só as linhas depois dessa marca passam pelo
+# tratamento. Se o hash do prefixo não bater (linha editada/apagada)
+# a planilha é tratada inteira de novo.
+#
+# As linhas viram DataFrame pelo mesmo TextParser do pd.read_excel:
+# na_values padrão ("#N/A", "NA", ...) e coluna numérica com número
+# colado como texto pelo robô ("38724") vira número. Essa inferência
+# é por coluna inteira — uma célula de texto que não é número deixa a
+# coluna toda como texto. A marca guarda essas colunas ("textuais")
+# para as linhas novas terem o mesmo resultado da planilha inteira.
+# ==========================================================
+def ler_linhas_excel(caminho: Path, motor: str = None):
+    """
+    Cabeçalho + linhas brutas da 1ª aba, só com as colunas que o cálculo
+    usa (colunas_necessarias), sem linhas vazias no fim.
+    """
+    return leitor_excel.ler_planilha(caminho, colunas_necessarias, motor or MOTOR_EXCEL)
+
+
+def _linhas_para_df(colunas, linhas, inicio: int, textuais=()) -> pd.DataFrame:
+    """
+    Mesmo DataFrame que o pd.read_excel daria a essas linhas. As colunas
+    de `textuais` não passam pela conversão para número.
+    """
+    largura = len(colunas)
+    linhas = [tuple(l[:largura]) + (None,) * (largura - len(l)) for l in linhas]
+    df = TextParser(
+        linhas, names=colunas, header=None, skip_blank_lines=False,
+        dtype={c: object for c in textuais if c in colunas} or None,
+    ).read()
+    # o pd.read_excel entrega célula vazia como "" (→ NaN); aqui ela chega None
+    for coluna in df.columns[df.dtypes == object]:
+        df[coluna] = df[coluna].mask(df[coluna].isna(), np.nan)
+    df.index = pd.RangeIndex(inicio, inicio + len(df))
+    return df
+
+
+def _colunas_texto(df: pd.DataFrame) -> list:
+    return [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+
+
+def carregar_planilha_incremental(caminho: Path, recarregar: bool = False, cache_dir: Path = None, versao=None):
+    """
+    Devolve (df, marca): o DataFrame tratado e a marca d'água gravada
+    (linhas, hash_prefixo, textuais, ultima_data, ultimo_pedido, modo,
+    linhas_novas). cache_dir/versao: padrão CACHE_DIR/VERSAO_TRATAMENTO.
+    """
+    cache_dir = CACHE_DIR if cache_dir is None else Path(cache_dir)
+    versao = VERSAO_TRATAMENTO if versao is None else versao
+    with instrumentacao.etapa("ler_excel") as reg:
+        colunas, linhas = ler_linhas_excel(caminho)
+        reg["linhas_saida"] = len(linhas)
+
+    meta, df_prefixo = (None, None)
+    if not recarregar:
+        meta, df_prefixo = cache_planilhas.ler_entrada(cache_dir, caminho, versao)
+    marca = (meta or {}).get("incremental")
+
+    h = hashlib.sha256(repr(colunas).encode())
+    n = 0
+    if marca and marca["linhas"] <= len(linhas):
+        for linha in linhas[:marca["linhas"]]:
+            h.update(repr(linha).encode())
+        if h.hexdigest() == marca["hash_prefixo"]:
+            n = marca["linhas"]
+
+    bruto = None
+    if n:
+        textuais = marca["textuais"]
+        bruto = _linhas_para_df(colunas, linhas[n:], n, textuais)
+        if len(bruto) and _colunas_texto(bruto) != textuais:
+            # coluna que era toda numérica ganhou texto: na planilha
+            # inteira ela ficaria toda como texto, inclusive no prefixo
+            n, bruto = 0, None
+
+    if n == 0:
+        # sem marca ou prefixo alterado → reconstrução completa
+        df_prefixo = None
+        h = hashlib.sha256(repr(colunas).encode())
+        bruto = _linhas_para_df(colunas, linhas, 0)
+        textuais = _colunas_texto(bruto)
+
+    for linha in linhas[n:]:
+        h.update(repr(linha).encode())
+
+    novas = tratar_planilha(bruto)
+    if df_prefixo is None:
+        df = novas
+    elif len(novas):
+        # categorias do cache e das linhas novas podem diferir → concat volta a texto
+        df = compactar_dataset(pd.concat([df_prefixo, novas]))
+        if not df.index.is_monotonic_increasing:
+            df = ordenar_por_data(df)
+    else:
+        df = df_prefixo
+
+    ultimo_pedido = df["PEDIDO"].iloc[-1] if len(df) else None
+    marca = {
+        "linhas": len(linhas),
+        "hash_prefixo": h.hexdigest(),
+        "textuais": textuais,
+        "ultima_data": df["DATA"].max().strftime("%d/%m/%Y") if len(df) else None,
+        "ultimo_pedido": None if pd.isna(ultimo_pedido) else str(ultimo_pedido),
+        "modo": "incremental" if n else "completo",
+        "linhas_novas": len(linhas) - n,
+    }
+    return df, marca
+
+
+def carregar_planilha_cache(caminho: Path, recarregar: bool = False,
+                            incremental: bool = INGESTAO_INCREMENTAL, gravar_cache: bool = True,
+                            cache_dir: Path = None, versao=None) -> pd.DataFrame:
+    """
+    carregar_planilha com cache em disco: planilha sem alteração
+    (mesmo tamanho/mtime ou mesmo sha256) volta direto do cache; planilha
+    que só ganhou linhas no fim passa pelo modo incremental.
+    recarregar=True ignora o cache e refaz a leitura do Excel;
+    gravar_cache=False usa o cache mas não grava nele (--dry-run).
+    cache_dir/versao: padrão CACHE_DIR/VERSAO_TRATAMENTO.
+    """
+    cache_dir = CACHE_DIR if cache_dir is None else Path(cache_dir)
+    versao = VERSAO_TRATAMENTO if versao is None else versao
+    if not recarregar:
+        with instrumentacao.etapa("ler_cache") as reg:
+            df = cache_planilhas.ler_cache(cache_dir, caminho, versao)
+            reg["linhas_saida"] = None if df is None else len(df)
+        if df is not None:
+            return df
+
+    extra = None
+    if incremental:
+        df, marca = carregar_planilha_incremental(caminho, recarregar, cache_dir, versao)
+        extra = {"incremental": marca}
+    else:
+        df = carregar_planilha(caminho)
+
+    if not gravar_cache:
+        return df
+    try:
+        with instrumentacao.etapa("gravar_cache", len(df)):
+            cache_planilhas.gravar_cache(
+                cache_dir, caminho, df, versao,
+                limite_bytes=CACHE_LIMITE_MB * 1024 * 1024, extra=extra,
+            )
+    except OSError:
+        # sem permissão/espaço para o cache não impede a atualização
+        pass
+    return df
+
+
+# ==========================================================
+# CARREGAR VÁRIAS PLANILHAS — em paralelo quando compensa
+# ==========================================================
+def _carregar_cronometrado(caminho: Path, recarregar: bool, gravar_cache: bool, cache_dir: Path, versao):
+    t0 = time.perf_counter()
+    with instrumentacao.etapa(f"carregar {caminho.name}") as reg:
+        df = carregar_planilha_cache(caminho, recarregar, gravar_cache=gravar_cache, cache_dir=cache_dir, versao=versao)
+        reg["linhas_saida"] = len(df)
+    return df, time.perf_counter() - t0
+
+
+def _carregar_em_processo_filho(caminho: Path, recarregar: bool, medir: bool, gravar_cache: bool,
+                                cache_dir: Path, versao):
+    """
+    _carregar_cronometrado num processo do pool, devolvendo também as
+    medições. Tudo chega por argumento: o processo novo reimporta este
+    módulo, e CACHE_DIR/EXCEL_DIR trocados em tempo de execução voltariam
+    ao padrão.
+    """
+    if medir:
+        instrumentacao.iniciar()
+    df, segundos = _carregar_cronometrado(caminho, recarregar, gravar_cache, cache_dir, versao)
+    return df, segundos, instrumentacao.encerrar() if medir else []
+
+
+def pode_paralelizar() -> bool:
+    # no .exe (PyInstaller) cada processo filho reabriria o executável
+    return (os.cpu_count() or 1) > 1 and not getattr(sys, "frozen", False)
+
+
+def carregar_planilhas(caminhos, recarregar: bool = False, paralelo=None, ao_carregar=None,
+                       gravar_cache: bool = True, cache_dir: Path = None, versao=None):
+    """
+    Carrega várias planilhas e devolve ({caminho: df}, {nome do arquivo: segundos}).
+    As que estão no cache voltam direto; as demais são lidas em processos
+    separados (uma por núcleo) se houver mais de uma e a máquina permitir.
+    ao_carregar(nome do arquivo) é chamado a cada planilha lida do Excel;
+    uma exceção dele (ex.: AtualizacaoCancelada) interrompe as que faltam.
+    gravar_cache=False não grava as planilhas lidas no cache em disco;
+    cache_dir/versao: padrão CACHE_DIR/VERSAO_TRATAMENTO.
+    """
+    caminhos = [Path(c) for c in caminhos]
+    cache_dir = CACHE_DIR if cache_dir is None else Path(cache_dir)
+    versao = VERSAO_TRATAMENTO if versao is None else versao
+    dfs, tempos, pendentes = {}, {}, []
+
+    for caminho in caminhos:
+        t0 = time.perf_counter()
+        df = None
+        if not recarregar:
+            with instrumentacao.etapa(f"ler_cache {caminho.name}") as reg:
+                df = cache_planilhas.ler_cache(cache_dir, caminho, versao)
+                reg["linhas_saida"] = None if df is None else len(df)
+        if df is None:
+            pendentes.append(caminho)
+        else:
+            dfs[caminho] = df
+            tempos[caminho.name] = time.perf_counter() - t0
+
+    if paralelo is None:
+        paralelo = pode_paralelizar()
+
+    if paralelo and len(pendentes) > 1:
+        # spawn em todo sistema, como no Windows: o filho só vê o que recebe por argumento
+        pool = ProcessPoolExecutor(max_workers=min(len(pendentes), os.cpu_count() or 1),
+                                   mp_context=multiprocessing.get_context("spawn"))
+        try:
+            medir = instrumentacao.ligada()
+            futuros = {
+                pool.submit(_carregar_em_processo_filho, c, recarregar, medir, gravar_cache, cache_dir, versao): c
+                for c in pendentes
+            }
+            for futuro in as_completed(futuros):
+                caminho = futuros[futuro]
+                dfs[caminho], tempos[caminho.name], medicoes = futuro.result()
+                instrumentacao.anexar(medicoes, processo="filho")
+                if ao_carregar is not None:
+                    ao_carregar(caminho.name)
+        finally:
+            pool.shutdown(cancel_futures=True)
+    else:
+        for caminho in pendentes:
+            dfs[caminho], tempos[caminho.name] = _carregar_cronometrado(caminho, recarregar, gravar_cache,
+                                                                        cache_dir, versao)
+            if ao_carregar is not None:
+                ao_carregar(caminho.name)
+
+    return {c: dfs[c] for c in caminhos}, tempos
+
+
+# ==========================================================
+# CATÁLOGO DE PLANILHAS POR ANO — excel/PEDIDOS_<AAAA>.xlsx
+# ----------------------------------------------------------
+# Cada ano só é carregado quando algum período pedido cai nele, e
+# fica guardado em memória enquanto o arquivo não mudar.
+# ==========================================================
+PADRAO_PLANILHA = re.compile(r"^PEDIDOS_(\d{4})\.xlsx$", re.IGNORECASE)
+
+_DATASETS = {}   # caminho → ((tamanho, mtime_ns), df)
+
+
+def descobrir_planilhas(pasta: Path = None) -> dict:
+    """{ano: caminho} das planilhas PEDIDOS_<AAAA>.xlsx (ignora ~$ do Excel aberto)."""
+    pasta = Path(pasta or EXCEL_DIR)
+    catalogo = {}
+    if pasta.exists():
+        for arq in pasta.iterdir():
+            m = PADRAO_PLANILHA.match(arq.name)
+            if m and arq.is_file():
+                catalogo[int(m.group(1))] = arq
+    return dict(sorted(catalogo.items()))
+
+
+def anos_das_janelas(janelas) -> set:
+    """Anos tocados por uma coleção de janelas (inicio, fim)."""
+    anos = set()
+    for inicio, fim in janelas:
+        anos.update(range(inicio.year, fim.year + 1))
+    return anos
+
+
+def carregar_anos(anos, recarregar: bool = False, catalogo: dict = None, ao_carregar=None,
+                  gravar_cache: bool = True, cache_dir: Path = None, versao=None):
+    """
+    ({ano: df}, {arquivo: segundos}) para os anos pedidos que existem no
+    catálogo. Anos já em memória e sem alteração no arquivo não são relidos.
+    Os que faltam vão juntos para carregar_planilhas (ver ao_carregar,
+    gravar_cache, cache_dir e versao lá).
+    """
+    catalogo = descobrir_planilhas() if catalogo is None else catalogo
+    caminhos = {ano: catalogo[ano] for ano in sorted(anos) if ano in catalogo}
+
+    dfs, pendentes = {}, []
+    for ano, caminho in caminhos.items():
+        st = os.stat(caminho)
+        assinatura = (st.st_size, st.st_mtime_ns)
+        guardado = _DATASETS.get(caminho)
+        if guardado and guardado[0] == assinatura and not recarregar:
+            dfs[ano] = guardado[1]
+        else:
+            pendentes.append((ano, caminho, assinatura))
+
+    tempos = {}
+    if pendentes:
+        carregados, tempos = carregar_planilhas([c for _, c, _ in pendentes], recarregar,
+                                                ao_carregar=ao_carregar, gravar_cache=gravar_cache,
+                                                cache_dir=cache_dir, versao=versao)
+        for ano, caminho, assinatura in pendentes:
+            dfs[ano] = carregados[caminho]
+            _DATASETS[caminho] = (assinatura, dfs[ano])
+
+    return dict(sorted(dfs.items())), tempos
+
+
+def esquecer_anos():
+    """Libera os datasets guardados em memória."""
+    _DATASETS.clear()
+
+
+# ==========================================================
+# DEFINIR PERÍODO — usa última data real da planilha mais recente
 # ==========================================================
 def definir_periodo(df_2026, data_inicio=None, data_fim=None):
     if data_inicio and data_fim:
@@ -144,17 +830,51 @@ def definir_periodo(df_2026, data_inicio=None, data_fim=None):
     )
 
 
+def ano_com_pedidos(dfs: dict) -> int:
+    """
+    Ano mais recente de {ano: df} que tem pedidos — em janeiro a planilha
+    do ano novo pode existir ainda vazia (a última data dela seria NaT).
+    """
+    anos = [ano for ano, df in dfs.items() if len(df)]
+    if not anos:
+        raise ValueError(f"Nenhum pedido nas planilhas PEDIDOS_<ano>.xlsx em {EXCEL_DIR}")
+    return max(anos)
+
+
 # ==========================================================
 # GERAR RESUMO
 # ==========================================================
+def fatiar_periodo(df, inicio, fim):
+    """Linhas com inicio <= DATA <= fim (busca binária se o índice for a DATA ordenada)."""
+    idx = df.index
+    if isinstance(idx, pd.DatetimeIndex) and idx.is_monotonic_increasing:
+        i = idx.searchsorted(pd.Timestamp(inicio), side="left")
+        j = idx.searchsorted(pd.Timestamp(fim), side="right")
+        return df.iloc[i:j]
+
+    return df[(df["DATA"] >= inicio) & (df["DATA"] <= fim)]
+
+
+def soma_exata(serie) -> float:
+    """
+    Soma com arredondamento único (math.fsum): não depende da ordem das
+    linhas e é o mesmo valor que o cubo diário obtém pelas somas acumuladas.
+    """
+    return math.fsum(np.asarray(serie, dtype="float64"))
+
+
 def resumo(df, inicio, fim):
-    d = df[(df["DATA"] >= inicio) & (df["DATA"] <= fim)]
+    d = fatiar_periodo(df, inicio, fim)
 
     pedidos = d["PEDIDO"].nunique()
-    fat = float(d["VALOR COM IPI"].sum())
-    kg = float(d["KG"].sum())
-    m2 = float(d["TOTAL M2"].sum())
+    fat = soma_exata(d["VALOR COM IPI"])
+    kg = soma_exata(d["KG"])
+    m2 = soma_exata(d["TOTAL M2"])
+
+    return montar_resumo(pedidos, fat, kg, m2, inicio, fim)
+
 
+def montar_resumo(pedidos, fat, kg, m2, inicio, fim):
     return {
         "pedidos": pedidos,
         "fat": fat,
@@ -168,97 +888,777 @@ def resumo(df, inicio, fim):
     }
 
 
+# ==========================================================
+# CUBO DIÁRIO — somas acumuladas para KPIs de qualquer período
+# ----------------------------------------------------------
+# Uma linha por DATA com as somas do dia e a soma acumulada até o
+# dia. As acumuladas são inteiros exatos (valor * 2**escala), então a
+# soma de [inicio, fim] = acum[fim] - acum[inicio - 1] sai com o mesmo
+# arredondamento único de soma_exata / resumo, em duas buscas binárias.
+# ==========================================================
+MEDIDAS = ["VALOR COM IPI", "KG", "TOTAL M2"]
+
+
+def _inteiros_exatos(valores: np.ndarray):
+    """(lista de int, escala) com valores[i] == inteiros[i] / 2**escala exatamente."""
+    valores = np.asarray(valores, dtype="float64")
+    if not np.isfinite(valores).all():
+        raise ValueError("cubo diário só aceita valores finitos")
+
+    mantissa, expoente = np.frexp(valores)
+    mantissa = (mantissa * 2.0 ** 53).astype("int64")   # exato: 53 bits
+    expoente = expoente.astype("int64") - 53
+    nao_zero = mantissa != 0
+    escala = int(max(0, -expoente[nao_zero].min())) if nao_zero.any() else 0
+    deslocamento = np.where(nao_zero, expoente + escala, 0)
+
+    return [int(m) << int(d) for m, d in zip(mantissa, deslocamento)], escala
+
+
+def montar_cubo_diario(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    DataFrame indexado pela DATA com LINHAS, a soma do dia de cada medida
+    (float) e "ACUM <medida>" (inteiro exato, ver _inteiros_exatos).
+    A escala de cada medida fica em cubo.attrs["escala"].
+    """
+    if not (isinstance(df.index, pd.DatetimeIndex) and df.index.is_monotonic_increasing):
+        df = ordenar_por_data(df)
+
+    dias, inicio_dia, linhas = np.unique(df.index.to_numpy(), return_index=True, return_counts=True)
+    fim_dia = np.append(inicio_dia[1:], len(df))
+
+    cubo = pd.DataFrame({"LINHAS": linhas}, index=pd.DatetimeIndex(dias))
+    escalas = {}
+    for medida in MEDIDAS:
+        inteiros, escala = _inteiros_exatos(df[medida].to_numpy())
+        diarios = [sum(inteiros[a:b]) for a, b in zip(inicio_dia, fim_dia)]
+
+        acumulado, total = [], 0
+        for v in diarios:
+            total += v
+            acumulado.append(total)
+
+        cubo[medida] = [v / (1 << escala) for v in diarios]
+        cubo["ACUM " + medida] = pd.Series(acumulado, index=cubo.index, dtype=object)
+        escalas[medida] = escala
+
+    cubo.attrs["escala"] = escalas
+    return cubo
+
+
+def somar_cubo(cubo: pd.DataFrame, inicio, fim) -> dict:
+    """Somas de cada medida em inicio <= DATA <= fim por duas buscas binárias."""
+    i = cubo.index.searchsorted(pd.Timestamp(inicio), side="left")
+    j = cubo.index.searchsorted(pd.Timestamp(fim), side="right")
+
+    somas = {"LINHAS": 0}
+    for medida in MEDIDAS:
+        somas[medida] = 0.0
+    if j <= i:
+        return somas
+
+    somas["LINHAS"] = int(cubo["LINHAS"].iloc[i:j].sum())
+    for medida in MEDIDAS:
+        acum = cubo["ACUM " + medida]
+        exato = acum.iloc[j - 1] - (acum.iloc[i - 1] if i else 0)
+        somas[medida] = exato / (1 << cubo.attrs["escala"][medida])
+    return somas
+
+
+# ==========================================================
+# ÍNDICE DE PEDIDOS — contagem de pedidos distintos sem nunique
+# ----------------------------------------------------------
+# Um pedido pode ter linhas em vários dias. Guardamos os pares
+# (pedido, DATA) ordenados pela DATA e, para cada par, a DATA anterior
+# do mesmo pedido. Os pedidos distintos de [inicio, fim] são os pares
+# do período cuja DATA anterior é < inicio (a 1ª aparição do pedido
+# dentro do período) — uma comparação vetorizada, sem hash das linhas.
+# ==========================================================
+SEM_DATA_ANTERIOR = np.iinfo("int64").min
+
+
+def _ns(data) -> int:
+    return pd.Timestamp(data).as_unit("ns").value
+
+
+def montar_indice_pedidos(*dfs: pd.DataFrame) -> dict:
+    """
+    Índice de pedidos de um ou mais datasets (pedido presente nas duas
+    planilhas conta uma vez só). "por_pedido" tem LINHAS, PRIMEIRA DATA,
+    ULTIMA DATA e os totais de cada medida por PEDIDO.
+    """
+    linhas = pd.concat([d[["DATA", "PEDIDO"] + MEDIDAS] for d in dfs], ignore_index=True)
+    linhas = linhas[linhas["PEDIDO"].notna()]
+
+    por_pedido = linhas.groupby("PEDIDO").agg(
+        **{
+            "LINHAS": ("DATA", "size"),
+            "PRIMEIRA DATA": ("DATA", "min"),
+            "ULTIMA DATA": ("DATA", "max"),
+        },
+        **{m: (m, "sum") for m in MEDIDAS},
+    )
+
+    pares = linhas[["PEDIDO", "DATA"]].drop_duplicates().sort_values("DATA", kind="stable")
+    datas = pares["DATA"].to_numpy("datetime64[ns]").view("int64")
+    anterior = pares.groupby("PEDIDO")["DATA"].shift().to_numpy("datetime64[ns]").view("int64").copy()
+    anterior[pares.groupby("PEDIDO").cumcount().to_numpy() == 0] = SEM_DATA_ANTERIOR
+
+    return {"por_pedido": por_pedido, "datas": datas, "anterior": anterior}
+
+
+def contar_pedidos(indice: dict, inicio, fim) -> int:
+    """Pedidos distintos com alguma linha em inicio <= DATA <= fim."""
+    ini, fi = _ns(inicio), _ns(fim)
+    i = np.searchsorted(indice["datas"], ini, side="left")
+    j = np.searchsorted(indice["datas"], fi, side="right")
+    return int(np.count_nonzero(indice["anterior"][i:j] < ini))
+
+
+def montar_indices(*dfs: pd.DataFrame) -> dict:
+    """Estruturas pré-calculadas de um ou mais datasets para consultas de período."""
+    df = dfs[0] if len(dfs) == 1 else compactar_dataset(pd.concat(dfs))
+    if not (isinstance(df.index, pd.DatetimeIndex) and df.index.is_monotonic_increasing):
+        df = ordenar_por_data(df)
+
+    return {
+        "df": df,
+        "cubo": montar_cubo_diario(df),
+        "pedidos": montar_indice_pedidos(df),
+    }
+
+
+def resumo_indices(indices: dict, inicio, fim):
+    """Mesmo resultado de resumo(df, inicio, fim), usando cubo diário + índice de pedidos."""
+    somas = somar_cubo(indices["cubo"], inicio, fim)
+    pedidos = contar_pedidos(indices["pedidos"], inicio, fim)
+
+    return montar_resumo(
+        pedidos, somas["VALOR COM IPI"], somas["KG"], somas["TOTAL M2"], inicio, fim
+    )
+
+
+# ==========================================================
+# RESUMO EM LOTE — várias janelas com uma passada nos dados
+# ==========================================================
+def _um_ano_antes(data):
+    # DateOffset: 29/02 vira 28/02 em vez de quebrar como date.replace
+    return (pd.Timestamp(data) - pd.DateOffset(years=1)).to_pydatetime()
+
+
+def janelas_padrao(referencia) -> dict:
+    """
+    Janelas comuns terminando em `referencia`, cada uma com a mesma janela
+    um ano antes ("<nome>_ano_anterior"):
+    mes_atual, trimestre_atual, ano_atual, ultimos_12_meses e mes_AAAA_MM
+    para cada um dos 12 meses fechados anteriores.
+    """
+    ref = pd.Timestamp(referencia).normalize()
+    inicio_tri = ref.replace(month=3 * ((ref.month - 1) // 3) + 1, day=1)
+
+    janelas = {
+        "mes_atual": (ref.replace(day=1), ref),
+        "trimestre_atual": (inicio_tri, ref),
+        "ano_atual": (ref.replace(month=1, day=1), ref),
+        "ultimos_12_meses": (ref - pd.DateOffset(years=1) + pd.Timedelta(days=1), ref),
+    }
+
+    mes = ref.replace(day=1)
+    for _ in range(12):
+        fim_mes = mes - pd.Timedelta(days=1)
+        mes = fim_mes.replace(day=1)
+        janelas[f"mes_{mes:%Y_%m}"] = (mes, fim_mes)
+
+    janelas = {nome: (i.to_pydatetime(), f.to_pydatetime()) for nome, (i, f) in janelas.items()}
+    for nome, (i, f) in list(janelas.items()):
+        janelas[nome + "_ano_anterior"] = (_um_ano_antes(i), _um_ano_antes(f))
+
+    return janelas
+
+
+def resumo_lote(indices: dict, janelas: dict) -> dict:
+    """
+    {nome: resumo} para cada janela {nome: (inicio, fim)}. O custo de
+    montar_indices é pago uma vez; cada janela é só busca binária.
+    """
+    return {nome: resumo_indices(indices, inicio, fim) for nome, (inicio, fim) in janelas.items()}
+
+
+# ==========================================================
+# PRÉVIA — KPIs de um período qualquer para a interface
+# ----------------------------------------------------------
+# Usa os anos já em memória (_DATASETS) e os índices montados
+# sobre eles (compartilhados com o main()); respostas repetidas
+# saem de um LRU limitado, com chave (versão dos datasets, período).
+# ==========================================================
+LIMITE_PREVIAS = 256
+
+_PREVIAS = OrderedDict()   # (versao, inicio, fim) → {"atual", "anterior"}
+_INDICES = {"versao": None, "dfs": (), "indices": None}
+_LOCK_INDICES = threading.Lock()
+
+
+def versao_datasets(anos, catalogo: dict) -> tuple:
+    """Identifica o conteúdo dos anos em memória: ((ano, (tamanho, mtime_ns)), ...)."""
+    return tuple((ano, _DATASETS[catalogo[ano]][0]) for ano in sorted(anos))
+
+
+def indices_em_memoria(dfs: dict, catalogo: dict):
+    """
+    (versao, índices) dos anos em `dfs`; só remonta quando a versão ou os
+    próprios DataFrames mudaram (recarregar=True troca os objetos).
+    """
+    versao = versao_datasets(dfs, catalogo)
+    atuais = tuple(dfs.values())
+    if _INDICES["versao"] != versao or any(a is not b for a, b in zip(_INDICES["dfs"], atuais)):
+        _INDICES.update(versao=versao, dfs=atuais, indices=montar_indices(*atuais))
+    return versao, _INDICES["indices"]
+
+
+def previa(data_inicio, data_fim, catalogo: dict = None) -> dict:
+    """
+    {"atual", "anterior"} no formato de resumo() para o período dd/mm/aaaa,
+    sem gravar nem publicar nada. A primeira chamada carrega os anos
+    necessários; as seguintes respondem em milissegundos.
+    """
+    inicio, fim = definir_periodo(None, data_inicio, data_fim)
+    inicio_ant, fim_ant = _um_ano_antes(inicio), _um_ano_antes(fim)
+
+    with _LOCK_INDICES:
+        catalogo = descobrir_planilhas() if catalogo is None else catalogo
+        # anos já em memória entram junto para os índices não serem refeitos
+        # a cada troca de período
+        anos = anos_das_janelas([(inicio, fim), (inicio_ant, fim_ant)])
+        anos |= {ano for ano, caminho in catalogo.items() if caminho in _DATASETS}
+        dfs, _ = carregar_anos(anos, catalogo=catalogo)
+        versao, indices = indices_em_memoria(dfs, catalogo)
+
+        chave = (versao, inicio, fim)
+        if chave in _PREVIAS:
+            _PREVIAS.move_to_end(chave)
+            return _PREVIAS[chave]
+
+        resultado = {
+            "atual": resumo_indices(indices, inicio, fim),
+            "anterior": resumo_indices(indices, inicio_ant, fim_ant),
+        }
+        _PREVIAS[chave] = resultado
+        while len(_PREVIAS) > LIMITE_PREVIAS:
+            _PREVIAS.popitem(last=False)
+        return resultado
+
+
 # ==========================================================
 # SALVAR JSON
 # ==========================================================
-def salvar_json(nome, payload):
-    DADOS_DIR_2.mkdir(parents=True, exist_ok=True)
-    with open(DADOS_DIR_2 / nome, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
+# pacote único lido pelo kpis.js; os 5 arquivos antigos continuam
+# sendo gerados enquanto GERAR_JSON_LEGADO for True
+ARQ_PACOTE = "kpis.json"
+VERSAO_PACOTE = 1
+GERAR_JSON_LEGADO = True
+
+
+def serializar_json(payload, compacto: bool = False) -> bytes:
+    if compacto:
+        texto = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    else:
+        texto = json.dumps(payload, indent=2, ensure_ascii=False)
+    return texto.encode("utf-8")
+
+
+def gravar_atomico(caminho: Path, conteudo: bytes):
+    """
+    Grava em arquivo temporário na mesma pasta e troca de uma vez (os.replace).
+    O temporário é por processo e thread: a interface e o serviço podem
+    gravar o mesmo JSON ao mesmo tempo (mesmo padrão de cache_planilhas).
+    """
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    tmp = caminho.with_name(f".{caminho.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, caminho)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def hash_conteudo(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def hash_arquivo_existente(caminho: Path):
+    try:
+        return hash_conteudo(caminho.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def salvar_json(nome, payload, compacto: bool = False, pasta: Path = None, gravar: bool = True) -> bool:
+    """
+    Grava o JSON só se o conteúdo mudou (sha256 dos bytes serializados
+    contra o arquivo atual). Devolve True quando o arquivo foi (ou, com
+    gravar=False, seria) regravado.
+    """
+    caminho = Path(pasta or DADOS_DIR_2) / nome
+    conteudo = serializar_json(payload, compacto)
+    if hash_arquivo_existente(caminho) == hash_conteudo(conteudo):
+        return False
+    if gravar:
+        gravar_atomico(caminho, conteudo)
+    return True
+
+
+def variacao(atual, anterior):
+    return ((atual / anterior) - 1) * 100 if anterior else 0
+
+
+def montar_pacote(atual, anterior, janelas) -> dict:
+    """Todos os KPIs do painel num único JSON versionado."""
+    return {
+        "versao": VERSAO_PACOTE,
+        "periodo": {
+            "inicio": atual["inicio"],
+            "fim": atual["fim"],
+            "inicio_ano_anterior": anterior["inicio"],
+            "fim_ano_anterior": anterior["fim"],
+        },
+        "atual": atual,
+        "ano_anterior": anterior,
+        "variacao": {
+            chave: variacao(atual[chave], anterior[chave])
+            for chave in ("pedidos", "fat", "kg", "m2", "ticket", "preco_kg", "preco_m2")
+        },
+        "janelas": janelas,
+    }
+
+
+def montar_json_legado(atual, anterior) -> dict:
+    """{arquivo: payload} no formato dos 5 JSONs antigos do painel."""
+    return {
+        "kpi_faturamento.json": {
+            "atual": atual["fat"],
+            "ano_anterior": anterior["fat"],
+            "variacao": variacao(atual["fat"], anterior["fat"]),
+            "inicio_mes": atual["inicio"],
+            "data_atual": atual["fim"],
+            "inicio_mes_anterior": anterior["inicio"],
+            "data_ano_anterior": anterior["fim"]
+        },
+        "kpi_quantidade_pedidos.json": {
+            "atual": atual["pedidos"],
+            "ano_anterior": anterior["pedidos"],
+            "variacao": variacao(atual["pedidos"], anterior["pedidos"])
+        },
+        "kpi_kg_total.json": {
+            "atual": atual["kg"],
+            "ano_anterior": anterior["kg"],
+            "variacao": variacao(atual["kg"], anterior["kg"])
+        },
+        "kpi_ticket_medio.json": {
+            "atual": atual["ticket"],
+            "ano_anterior": anterior["ticket"],
+            "variacao": variacao(atual["ticket"], anterior["ticket"])
+        },
+        "kpi_preco_medio.json": {
+            "atual": {
+                "preco_medio_kg": atual["preco_kg"],
+                "preco_medio_m2": atual["preco_m2"],
+                "total_kg": atual["kg"],
+                "total_m2": atual["m2"],
+                "data": atual["fim"],
+            },
+            "ano_anterior": {
+                "preco_medio_kg": anterior["preco_kg"],
+                "preco_medio_m2": anterior["preco_m2"],
+                "total_kg": anterior["kg"],
+                "total_m2": anterior["m2"],
+                "data": anterior["fim"],
+            }
+        },
+    }
 
 
 # ==========================================================
 # 🔥 PUSH AUTOMÁTICO PARA GITHUB
 # ==========================================================
 def push_github():
+    # síncrono; para não travar quem chamou use publicador.solicitar_publicacao
     try:
-        subprocess.run(["git", "add", "."], cwd=BASE_DIR, check=True)
-        subprocess.run(["git", "commit", "-m", "Atualização automática painel"], cwd=BASE_DIR, check=True)
-        subprocess.run(["git", "push", "origin", "main"], cwd=BASE_DIR, check=True)
+        publicador.publicar_git(BASE_DIR)
         return True
     except Exception as e:
         return False
 
 
+def publicacao_pendente() -> bool:
+    """
+    KPIs que o git ainda não publicou (ver publicador.ha_o_que_publicar).
+    Sem git/repositório não há o que enviar → False.
+    """
+    try:
+        return publicador.ha_o_que_publicar(BASE_DIR)
+    except Exception:
+        return False
+
+
+# ==========================================================
+# ETAPAS — progresso e cancelamento entre as etapas do main()
+# ==========================================================
+class AtualizacaoCancelada(Exception):
+    """cancelar() pediu para parar; nada depois da etapa anterior foi feito."""
+
+
+def _avisar_etapa(etapa: str, progresso=None, cancelar=None):
+    if cancelar is not None and cancelar():
+        raise AtualizacaoCancelada(etapa)
+    if progresso is not None:
+        progresso(etapa)
+
+
 # ==========================================================
 # MAIN — usado pelo .EXE
 # ==========================================================
-def main(data_inicio=None, data_fim=None):
-    df_2026 = carregar_planilha(EXCEL_2026)
-    df_2025 = carregar_planilha(EXCEL_2025)
-
-    inicio, fim = definir_periodo(df_2026, data_inicio, data_fim)
-    inicio_ant = inicio.replace(year=inicio.year - 1)
-    fim_ant = fim.replace(year=fim.year - 1)
-
-    atual = resumo(df_2026, inicio, fim)
-    anterior = resumo(df_2025, inicio_ant, fim_ant)
-
-    # salvar JSONs normais aqui...
-    salvar_json("kpi_faturamento.json", {
-        "atual": atual["fat"],
-        "ano_anterior": anterior["fat"],
-        "variacao": ((atual["fat"]/anterior["fat"]) - 1) * 100 if anterior["fat"] else 0,
-        "inicio_mes": atual["inicio"],
-        "data_atual": atual["fim"],
-        "inicio_mes_anterior": anterior["inicio"],
-        "data_ano_anterior": anterior["fim"]
-    })
+def gravar_kpis(atual, anterior, janelas, pasta: Path = None, gravar: bool = True,
+                legado: bool = None) -> list:
+    """
+    Pacote único (compacto) + JSONs antigos para compatibilidade; arquivos
+    com o mesmo conteúdo não são tocados. Devolve os nomes alterados.
+    """
+    legado = GERAR_JSON_LEGADO if legado is None else legado
+    alterados = []
+    if salvar_json(ARQ_PACOTE, montar_pacote(atual, anterior, janelas), True, pasta, gravar):
+        alterados.append(ARQ_PACOTE)
+    if legado:
+        for nome, payload in montar_json_legado(atual, anterior).items():
+            if salvar_json(nome, payload, False, pasta, gravar):
+                alterados.append(nome)
+    return alterados
 
-    salvar_json("kpi_quantidade_pedidos.json", {
-        "atual": atual["pedidos"],
-        "ano_anterior": anterior["pedidos"],
-        "variacao": ((atual["pedidos"]/anterior["pedidos"]) - 1) * 100 if anterior["pedidos"] else 0
-    })
 
-    salvar_json("kpi_kg_total.json", {
-        "atual": atual["kg"],
-        "ano_anterior": anterior["kg"],
-        "variacao": ((atual["kg"]/anterior["kg"]) - 1) * 100 if anterior["kg"] else 0
-    })
+def main(data_inicio=None, data_fim=None, recarregar=False, publicar=True,
+         progresso=None, cancelar=None, gravar=True, saida=None, medir=None):
+    """
+    progresso(etapa) é chamado no início de cada etapa e cancelar() é
+    consultado antes dela (True → AtualizacaoCancelada). Na carga dos anos
+    há uma etapa a cada planilha pronta.
 
-    salvar_json("kpi_ticket_medio.json", {
-        "atual": atual["ticket"],
-        "ano_anterior": anterior["ticket"],
-        "variacao": ((atual["ticket"]/anterior["ticket"]) - 1) * 100 if anterior["ticket"] else 0
-    })
+    gravar=False calcula sem gravar nada — JSONs, cache das planilhas,
+    log de execuções — nem publicar ("alterados" diz o que mudaria);
+    saida troca a pasta dos JSONs (padrão DADOS_DIR_2).
 
-    salvar_json("kpi_preco_medio.json", {
-        "atual": {
-            "preco_medio_kg": atual["preco_kg"],
-            "preco_medio_m2": atual["preco_m2"],
-            "total_kg": atual["kg"],
-            "total_m2": atual["m2"],
-            "data": atual["fim"],
-        },
-        "ano_anterior": {
-            "preco_medio_kg": anterior["preco_kg"],
-            "preco_medio_m2": anterior["preco_m2"],
-            "total_kg": anterior["kg"],
-            "total_m2": anterior["m2"],
-            "data": anterior["fim"],
+    "publicacao_pendente" diz se há KPIs a enviar: alterados agora ou
+    deixados para trás por uma execução anterior (ver publicacao_pendente).
+
+    medir=True (ou PAINEL_MEDIR=1) mede cada etapa — wall, CPU, linhas e
+    pico de memória —, devolve em "medicoes" e, se gravar, acrescenta
+    uma linha em ARQ_LOG_EXECUCOES (cache/execucoes.jsonl).
+    """
+    argumentos = dict(
+        data_inicio=data_inicio, data_fim=data_fim, recarregar=recarregar, publicar=publicar,
+        progresso=progresso, cancelar=cancelar, gravar=gravar, saida=saida,
+    )
+    if not (MEDIR_ETAPAS if medir is None else medir):
+        resultado = _atualizar(**argumentos)
+        resultado["medicoes"] = []
+        return resultado
+
+    instrumentacao.iniciar()
+    t0 = time.perf_counter()
+    resultado, erro = None, None
+    try:
+        resultado = _atualizar(**argumentos)
+        return resultado
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        medicoes = instrumentacao.encerrar()
+        if resultado is not None:
+            resultado["medicoes"] = medicoes
+        registro = {
+            "periodo": [resultado["atual"]["inicio"], resultado["atual"]["fim"]] if resultado else [data_inicio, data_fim],
+            "ok": erro is None,
+            "erro": erro,
+            "total_s": round(time.perf_counter() - t0, 6),
+            "etapas": medicoes,
         }
-    })
+        try:
+            if gravar:
+                instrumentacao.registrar_execucao(ARQ_LOG_EXECUCOES, registro)
+        except OSError:
+            pass
+
+
+def _atualizar(data_inicio, data_fim, recarregar, publicar, progresso, cancelar, gravar, saida):
+    def etapa(nome):
+        _avisar_etapa(nome, progresso, cancelar)
+
+    catalogo = descobrir_planilhas()
+    if not catalogo:
+        raise FileNotFoundError(f"Nenhuma planilha PEDIDOS_<ano>.xlsx em {EXCEL_DIR}")
+
+    dfs, tempos_carga = {}, {}
+
+    def carregar(anos):
+        # todos os anos numa chamada só: carregar_planilhas lê em paralelo
+        anos = sorted((set(anos) & set(catalogo)) - set(dfs), reverse=True)
+        if not anos:
+            return
+        rotulo = ", ".join(map(str, anos))
+        prontas = []
+
+        def ao_carregar(nome):
+            prontas.append(nome)
+            etapa(f"Carregando {rotulo} — {nome} pronta ({len(prontas)}/{len(anos)})")
+
+        etapa(f"Carregando {rotulo}")
+        with instrumentacao.etapa(f"carregar {rotulo}"):
+            carregados, tempos = carregar_anos(anos, recarregar, catalogo, ao_carregar, gravar)
+        dfs.update(carregados)
+        tempos_carga.update(tempos)
+
+    if data_inicio and data_fim:
+        inicio, fim = definir_periodo(None, data_inicio, data_fim)
+    else:
+        # período automático: 01 → última data da planilha mais recente com
+        # pedidos (em janeiro a do ano novo pode estar vazia).
+        # A última data ainda não é conhecida; os anos que as consultas
+        # tocam com ela em qualquer dia do último ano vão juntos
+        ultimo_ano = max(catalogo)
+        extremos = [(datetime(ultimo_ano, 1, 1), datetime(ultimo_ano, 1, 1)),
+                    (datetime(ultimo_ano, 12, 1), datetime(ultimo_ano, 12, 31))]
+        carregar(set().union(*(anos_das_janelas(_consultas_do_periodo(i, f).values()) for i, f in extremos)))
+        if not any(len(df) for df in dfs.values()):
+            carregar(catalogo)   # nenhum pedido nos anos recentes: procura nos antigos
+        inicio, fim = definir_periodo(dfs[ano_com_pedidos(dfs)])
+
+    consultas = _consultas_do_periodo(inicio, fim)
+    # período informado, ou última data fora do último ano
+    carregar(anos_das_janelas(consultas.values()))
+    dfs = dict(sorted(dfs.items()))
 
-    # PUSH AUTOMÁTICO
-    push_ok = push_github()
+    etapa("Calculando")
+    with instrumentacao.etapa("indices", sum(len(df) for df in dfs.values())) as reg:
+        with _LOCK_INDICES:
+            _, indices = indices_em_memoria(dfs, catalogo)
+        reg["linhas_saida"] = len(indices["cubo"])
+    with instrumentacao.etapa("resumo_lote", len(consultas)) as reg:
+        janelas = resumo_lote(indices, consultas)
+        reg["linhas_saida"] = len(janelas)
+    atual = janelas.pop("atual")
+    anterior = janelas.pop("anterior")
+
+    etapa("Gravando")
+    with instrumentacao.etapa("salvar_json") as reg:
+        alterados = gravar_kpis(atual, anterior, janelas, saida, gravar)
+        reg["linhas_saida"] = len(alterados)
+
+    # PUSH AUTOMÁTICO — quando algum KPI mudou ou o git ainda tem KPIs
+    # sem publicar (--no-push, cancelamento, push com falha...); None =
+    # não precisou. publicar=False deixa o envio com quem chamou (ex.:
+    # fila do publicador), que decide por "publicacao_pendente"
+    pendente = gravar and (bool(alterados) or publicacao_pendente())
+    push_ok = None
+    if pendente and publicar:
+        etapa("Publicando")
+        with instrumentacao.etapa("push_github"):
+            push_ok = push_github()
 
     return {
         "atual": atual,
         "anterior": anterior,
+        "janelas": janelas,
+        "tempos_carga": tempos_carga,
+        "alterados": alterados,
+        "publicacao_pendente": pendente,
         "push": push_ok
     }
 
 
+# ==========================================================
+# BACKFILL — KPIs mês a mês num processo só
+# ==========================================================
+PASTA_HISTORICO = "historico"
+
+
+def _periodos_mensais(mes_inicio: str, mes_fim: str) -> list:
+    """[(inicio, fim)] de cada mês entre mm/aaaa e mm/aaaa (inclusive)."""
+    primeiro = datetime.strptime(mes_inicio, "%m/%Y")
+    ultimo = datetime.strptime(mes_fim, "%m/%Y")
+    if ultimo < primeiro:
+        raise ValueError(f"mês final {mes_fim} antes do inicial {mes_inicio}")
+    return [
+        (m.to_pydatetime(), (m + pd.offsets.MonthEnd(0)).to_pydatetime())
+        for m in pd.date_range(primeiro, ultimo, freq="MS")
+    ]
+
+
+def _consultas_do_periodo(inicio, fim) -> dict:
+    return {
+        "atual": (inicio, fim),
+        "anterior": (_um_ano_antes(inicio), _um_ano_antes(fim)),
+        **janelas_padrao(fim),
+    }
+
+
+def backfill(mes_inicio: str, mes_fim: str, saida: Path = None, gravar: bool = True,
+             recarregar: bool = False) -> dict:
+    """
+    Regrava o kpis.json de cada mês de mes_inicio a mes_fim (mm/aaaa) em
+    <saida>/historico/AAAA-MM/. As planilhas são carregadas e indexadas uma
+    vez só para todos os meses; o mês corrente vai até a última data da
+    planilha. Devolve {"AAAA-MM": [arquivos alterados]}.
+    """
+    catalogo = descobrir_planilhas()
+    if not catalogo:
+        raise FileNotFoundError(f"Nenhuma planilha PEDIDOS_<ano>.xlsx em {EXCEL_DIR}")
+
+    periodos = _periodos_mensais(mes_inicio, mes_fim)
+    anos = set()
+    for inicio, fim in periodos:
+        anos |= anos_das_janelas(_consultas_do_periodo(inicio, fim).values())
+    dfs, _ = carregar_anos(anos, recarregar, catalogo, gravar_cache=gravar)
+    with _LOCK_INDICES:
+        _, indices = indices_em_memoria(dfs, catalogo)
+    ultima_data = dfs[ano_com_pedidos(dfs)]["DATA"].max()
+
+    resultado = {}
+    for inicio, fim in periodos:
+        fim = min(fim, ultima_data)
+        if fim < inicio:
+            continue   # mês ainda sem pedidos
+
+        janelas = resumo_lote(indices, _consultas_do_periodo(inicio, fim))
+        atual = janelas.pop("atual")
+        anterior = janelas.pop("anterior")
+        pasta = Path(saida or DADOS_DIR_2) / PASTA_HISTORICO / f"{inicio:%Y-%m}"
+        resultado[f"{inicio:%Y-%m}"] = gravar_kpis(atual, anterior, janelas, pasta, gravar, legado=False)
+
+    return resultado
+
+
+# ==========================================================
+# LINHA DE COMANDO
+# ==========================================================
+def _data_br(texto: str) -> str:
+    try:
+        datetime.strptime(texto, "%d/%m/%Y")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: {texto!r} (use dd/mm/aaaa)")
+    return texto
+
+
+def _mes_br(texto: str) -> str:
+    try:
+        datetime.strptime(texto, "%m/%Y")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"mês inválido: {texto!r} (use mm/aaaa)")
+    return texto
+
+
+def _imprimir_resultado(resultado: dict, simulacao: bool):
+    atual, anterior = resultado["atual"], resultado["anterior"]
+    print(f"Período: {atual['inicio']} até {atual['fim']} "
+          f"(ano anterior: {anterior['inicio']} até {anterior['fim']})")
+    print(f"Pedidos: {atual['pedidos']} | Faturamento: R$ {atual['fat']:,.2f} | "
+          f"KG: {atual['kg']:,.2f} | M2: {atual['m2']:,.2f}")
+    rotulo = "Mudariam" if simulacao else "Alterados"
+    print(f"{rotulo}: {', '.join(resultado['alterados']) or 'nenhum'}")
+    if not simulacao:
+        print("Push: " + {True: "ok", False: "FALHOU", None: "não feito"}[resultado["push"]])
+
+
+def cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="atualizar_painel_completo",
+        description="Atualiza os KPIs do painel comercial (período automático: 01 → última data da planilha).",
+    )
+    parser.add_argument("datas", nargs="*", metavar="DATA", type=_data_br,
+                        help="forma antiga: data inicial e final (dd/mm/aaaa)")
+    parser.add_argument("--inicio", type=_data_br, help="data inicial (dd/mm/aaaa)")
+    parser.add_argument("--fim", type=_data_br, help="data final (dd/mm/aaaa)")
+    parser.add_argument("--no-push", action="store_true", help="grava os JSONs mas não publica")
+    parser.add_argument("--dry-run", action="store_true", help="calcula e mostra o pacote; não grava nada (JSONs, cache, log) nem publica")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="ARQ",
+                        help="perfil cProfile: resumo no terminal ou salvo em ARQ (.prof)")
+    parser.add_argument("--saida", type=Path, metavar="PASTA",
+                        help="pasta dos JSONs (padrão site/dados); com ela nada é publicado")
+    parser.add_argument("--backfill", nargs=2, type=_mes_br, metavar=("MES_INICIO", "MES_FIM"),
+                        help="regrava os KPIs de cada mês (mm/aaaa) em <saida>/historico/AAAA-MM")
+    parser.add_argument("--recarregar", action="store_true", help="ignora o cache das planilhas")
+    parser.add_argument("--medir", action="store_true",
+                        help="mede cada etapa (tempo, CPU, linhas, memória) e registra em "
+                             f"{ARQ_LOG_EXECUCOES.parent.name}/{ARQ_LOG_EXECUCOES.name} (exceto com --dry-run)")
+    parser.add_argument("--vigiar", action="store_true", help="fica vigiando excel/ e atualiza a cada mudança")
+    args = parser.parse_args(argv)
+
+    if args.datas and (args.inicio or args.fim):
+        parser.error("use as datas posicionais ou --inicio/--fim, não os dois")
+    if len(args.datas) not in (0, 2):
+        parser.error("informe as duas datas: inicial e final")
+    data_inicio, data_fim = args.datas or (args.inicio, args.fim)
+    if bool(data_inicio) != bool(data_fim):
+        parser.error("--inicio e --fim vão juntos")
+
+    if args.vigiar:
+        import vigia_planilhas
+        try:
+            vigia_planilhas.vigiar()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    gravar = not args.dry_run
+    publicar = gravar and not args.no_push and args.saida is None
+
+    def executar():
+        if args.backfill:
+            meses = backfill(*args.backfill, saida=args.saida, gravar=gravar, recarregar=args.recarregar)
+            for mes, alterados in meses.items():
+                print(f"{mes}: {'alterado' if alterados else 'sem mudança'}")
+            if publicar and (any(meses.values()) or publicacao_pendente()):
+                return push_github()
+            return True
+
+        argumentos = {"data_inicio": data_inicio, "data_fim": data_fim, "recarregar": args.recarregar,
+                      "medir": args.medir or None}
+        resultado = None
+        if gravar and args.saida is None and args.profile is None:
+            # com o serviço residente no ar (servico_painel.py) ele faz o
+            # trabalho com as planilhas já em memória; senão, roda aqui
+            import servico_painel
+            try:
+                resultado = servico_painel.pedir({"comando": "atualizar", **argumentos, "publicar": publicar})
+            except servico_painel.ServicoIndisponivel:
+                pass
+        if resultado is None:
+            resultado = main(**argumentos, publicar=publicar, gravar=gravar, saida=args.saida)
+
+        if args.dry_run:
+            pacote = montar_pacote(resultado["atual"], resultado["anterior"], resultado["janelas"])
+            print(json.dumps(pacote, indent=2, ensure_ascii=False))
+        _imprimir_resultado(resultado, simulacao=args.dry_run)
+        if resultado.get("medicoes"):
+            print(instrumentacao.formatar_medicoes(resultado["medicoes"]))
+        return resultado["push"] is not False
+
+    if args.profile is None:
+        ok = executar()
+    else:
+        import cProfile
+        import pstats
+        perfil = cProfile.Profile()
+        ok = perfil.runcall(executar)
+        if args.profile == "-":
+            pstats.Stats(perfil, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+        else:
+            perfil.dump_stats(args.profile)
+            print(f"Perfil salvo em {args.profile}")
+
+    return 0 if ok else 1
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())
@@ -0,0 +1,945 @@
+# ===============================================================
+# BENCHMARK / CONFERÊNCIA — atualizar_painel_completo
+# ---------------------------------------------------------------
+# Uso:  python python/benchmark_painel.py                  → conferências + suíte
+#       python python/benchmark_painel.py --linhas 2000 20000
+#       python python/benchmark_painel.py --comparar [COMMIT]
+#
+# A suíte gera planilhas PEDIDOS_<AAAA>.xlsx sintéticas (mesmas 47
+# colunas da real, com números em texto brasileiro e datas serial do
+# Excel), mede carregar_planilha, limpar_numero, resumo e main — isolados
+# e de ponta a ponta — e acrescenta os tempos em benchmark/resultados.jsonl
+# com o commit atual, para comparar um commit com outro.
+# ===============================================================
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+import atualizar_painel_completo as painel
+import instrumentacao
+import leitor_excel
+import publicador
+
+PASTA_BENCH = painel.BASE_DIR / "benchmark"
+PASTA_PLANILHAS = PASTA_BENCH / "planilhas"          # geradas uma vez por tamanho/semente
+ARQ_RESULTADOS = PASTA_BENCH / "resultados.jsonl"     # só acrescenta
+
+# mude quando o gerador mudar → as planilhas sintéticas são geradas de novo
+VERSAO_GERADOR = 2
+ESCALAS = [2_000, 20_000, 200_000, 1_000_000]
+ANO_BENCH = 2026
+
+
+# ===============================================================
+# CORPUS ALEATÓRIO PARA limpar_numero
+# ===============================================================
+
+def _texto_brasileiro(rnd: random.Random) -> str:
+    v = rnd.uniform(0, 2_000_000)
+    formato = rnd.randrange(9)
+    if formato == 0:
+        s = f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")  # 1.234,56
+    elif formato == 1:
+        s = f"{v:.2f}".replace(".", ",")                                      # 1234,56
+    elif formato == 2:
+        s = f"{int(v):,}".replace(",", ".")                                   # 1.234.567
+    elif formato == 3:
+        s = f"{v:.{rnd.randrange(1, 5)}f}"                                    # 1234.5
+    elif formato == 4:
+        s = str(int(v))
+    elif formato == 5:
+        s = rnd.choice(VAZIOS_E_LIXO)
+    elif formato == 6:
+        s = f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    elif formato == 7:
+        s = f"{v:.3f}"                                                        # 12.345 → milhar
+    else:
+        s = f"{v:.2f} kg"
+    if formato != 5 and rnd.random() < 0.1:
+        s = "-" + s
+    if rnd.random() < 0.2:
+        s = f"  {s} "
+    return s
+
+
+VAZIOS_E_LIXO = ["", " ", "-", ",", ".", ",-", ".-", "kg", "R$", "n/d", "nan", "\t", "—"]
+
+
+def gerar_corpus(n: int, semente: int = 42) -> list:
+    rnd = random.Random(semente)
+    base = datetime(1899, 12, 30)
+    corpus = []
+    for _ in range(n):
+        r = rnd.random()
+        if r < 0.45:
+            corpus.append(_texto_brasileiro(rnd))
+        elif r < 0.60:
+            corpus.append(round(rnd.uniform(-1000, 100000), rnd.randrange(0, 4)))
+        elif r < 0.70:
+            corpus.append(rnd.randrange(-1000, 100000))
+        elif r < 0.75:
+            corpus.append(rnd.choice([None, np.nan, pd.NaT, pd.NA]))
+        elif r < 0.80:
+            corpus.append(rnd.choice([np.float64(rnd.uniform(0, 1e4)), np.int64(rnd.randrange(10**6)),
+                                      np.float32(rnd.uniform(0, 1e3)), True, False]))
+        elif r < 0.90:
+            # serial Excel "virado" data pelo Excel (1899-1901)
+            corpus.append(base + timedelta(days=rnd.uniform(0, 800)))
+        elif r < 0.95:
+            corpus.append(pd.Timestamp(base + timedelta(days=rnd.uniform(0, 50000))))
+        else:
+            corpus.append(datetime(2026, 1, 1) + timedelta(seconds=rnd.randrange(10**7)))
+    return corpus
+
+
+def conferir_paridade(n: int = 200_000) -> None:
+    """limpar_numero_serie tem que devolver exatamente os mesmos bits do apply escalar."""
+    serie = pd.Series(gerar_corpus(n), dtype=object)
+    esperado = serie.apply(painel.limpar_numero).to_numpy(dtype="float64")
+    obtido = painel.limpar_numero_serie(serie).to_numpy(dtype="float64")
+
+    diferentes = np.flatnonzero(esperado.view("int64") != obtido.view("int64"))
+    if len(diferentes):
+        i = diferentes[0]
+        raise AssertionError(
+            f"{len(diferentes)} diferenças; ex.: {serie.iloc[i]!r} → {esperado[i]!r} vs {obtido[i]!r}"
+        )
+
+    # colunas já tipadas (como o pandas entrega do Excel)
+    for tipada in (
+        pd.Series(np.random.default_rng(1).uniform(0, 1e5, 1000)),
+        pd.Series([1, 2, None], dtype="Int64"),
+        pd.Series(pd.to_datetime(["1900-01-05 06:00", "2025-03-01 00:00", None])),
+        pd.Series(["1.234,56", None, "12.345"], dtype="str"),
+    ):
+        esperado = tipada.apply(painel.limpar_numero).to_numpy(dtype="float64")
+        obtido = painel.limpar_numero_serie(tipada).to_numpy(dtype="float64")
+        assert np.array_equal(esperado.view("int64"), obtido.view("int64")), tipada
+
+    # texto inválido tem que falhar igual nos dois caminhos
+    for invalido in ("1.2.3", "1,2,3", "12-3"):
+        for funcao in (lambda s: s.apply(painel.limpar_numero), painel.limpar_numero_serie):
+            try:
+                funcao(pd.Series(["1,5", invalido], dtype=object))
+            except ValueError:
+                continue
+            raise AssertionError(f"{invalido!r} deveria gerar ValueError")
+
+    print(f"paridade limpar_numero: OK ({n:,} valores)")
+
+
+# ===============================================================
+# CONFERÊNCIA DO CUBO DIÁRIO + ÍNDICE DE PEDIDOS
+# ===============================================================
+
+def conferir_cubo(planilhas=None) -> None:
+    """resumo_indices tem que bater bit a bit com resumo em todo par de datas das planilhas."""
+    planilhas = planilhas or [painel.EXCEL_2026, painel.EXCEL_2025]
+    for caminho in planilhas:
+        df = painel.carregar_planilha(caminho)
+        indices = painel.montar_indices(df)
+        datas = list(indices["cubo"].index) + [pd.Timestamp(1990, 1, 1), pd.Timestamp(2100, 1, 1)]
+
+        pares = 0
+        for a in datas:
+            for b in datas:
+                if b < a:
+                    continue
+                esperado, obtido = painel.resumo(df, a, b), painel.resumo_indices(indices, a, b)
+                if repr(esperado) != repr(obtido):
+                    raise AssertionError(f"{caminho.name} {a:%d/%m/%Y}-{b:%d/%m/%Y}: {esperado} vs {obtido}")
+                pares += 1
+
+        print(f"cubo diário {caminho.name}: OK ({pares:,} períodos)")
+
+    # pedido com linhas nas duas planilhas conta uma vez só
+    dfs = [painel.carregar_planilha(c) for c in planilhas]
+    juntos = pd.concat(dfs)
+    indice = painel.montar_indice_pedidos(*dfs)
+    datas = sorted(juntos["DATA"].unique())
+    for a, b in zip(datas[::7], datas[::-7]):
+        a, b = min(a, b), max(a, b)
+        esperado = painel.fatiar_periodo(juntos, a, b)["PEDIDO"].nunique()
+        assert painel.contar_pedidos(indice, a, b) == esperado, (a, b)
+    print("índice de pedidos com as duas planilhas: OK")
+
+
+# ===============================================================
+# CONFERÊNCIA DOS MOTORES DE LEITURA (leitor_excel)
+# ===============================================================
+
+def conferir_motores(planilhas=None) -> None:
+    """
+    Cada motor disponível, com projeção de colunas, tem que dar o mesmo
+    DataFrame tratado que o carregamento antigo (pd.read_excel inteiro).
+    """
+    planilhas = planilhas or [painel.EXCEL_2026, painel.EXCEL_2025,
+                              *sorted(planilhas_sinteticas(2_000).glob("PEDIDOS_*.xlsx"))]
+    for caminho in planilhas:
+        esperado = painel.tratar_planilha(pd.read_excel(caminho))
+        for motor in leitor_excel.motores_disponiveis():
+            obtido = painel.carregar_planilha(caminho, motor)
+            if not obtido.index.equals(esperado.index):
+                raise AssertionError(f"{caminho.name} [{motor}]: linhas diferentes")
+            for col in obtido.columns:
+                a, b = obtido[col], esperado[col]
+                if col in painel.MEDIDAS:
+                    igual = np.array_equal(a.to_numpy("float64").view("int64"), b.to_numpy("float64").view("int64"))
+                else:
+                    vazio = a.isna().to_numpy()
+                    igual = (np.array_equal(vazio, b.isna().to_numpy())
+                             and a[~vazio].tolist() == b[~vazio].tolist())
+                if not igual:
+                    raise AssertionError(f"{caminho.name} [{motor}]: coluna {col} diferente")
+        print(f"motores de leitura {caminho.name}: OK ({', '.join(leitor_excel.motores_disponiveis())})")
+
+
+# ===============================================================
+# CONFERÊNCIA DA VIRADA DO ANO (planilha do ano novo ainda vazia)
+# ===============================================================
+
+def conferir_virada_do_ano() -> None:
+    """
+    Com PEDIDOS_<ano novo>.xlsx só com o cabeçalho, main e backfill usam a
+    última data do ano anterior; sem pedido em nenhuma planilha, ValueError.
+    """
+    origem = planilhas_sinteticas(2_000)
+    with tempfile.TemporaryDirectory(prefix="bench_virada_") as pasta:
+        pasta = Path(pasta)
+        for ano in (ANO_BENCH - 1, ANO_BENCH):
+            shutil.copy(origem / f"PEDIDOS_{ano}.xlsx", pasta)
+        gerar_planilha_pedidos(pasta / f"PEDIDOS_{ANO_BENCH + 1}.xlsx", ANO_BENCH + 1, 0)
+        ultima = painel.carregar_planilha(pasta / f"PEDIDOS_{ANO_BENCH}.xlsx")["DATA"].max()
+
+        with painel_apontando_para(pasta):
+            resultado = painel.main(publicar=False, gravar=False)
+            assert resultado["atual"]["fim"] == f"{ultima:%d/%m/%Y}", resultado["atual"]
+            meses = painel.backfill(f"{ultima:%m/%Y}", f"01/{ANO_BENCH + 1}", gravar=False)
+            assert list(meses) == [f"{ultima:%Y-%m}"], meses
+
+        for ano in (ANO_BENCH - 1, ANO_BENCH):
+            (pasta / f"PEDIDOS_{ano}.xlsx").unlink()
+        with painel_apontando_para(pasta):
+            try:
+                painel.main(publicar=False, gravar=False)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("sem pedidos em nenhuma planilha deveria gerar ValueError")
+    print(f"virada do ano (PEDIDOS_{ANO_BENCH + 1} vazia): OK")
+
+
+# ===============================================================
+# CONFERÊNCIA DO PUBLICADOR (repositório e remoto descartáveis)
+# ===============================================================
+
+def _repo_descartavel(pasta: Path):
+    """(repo, git) com um commit inicial já enviado a um remoto bare em `pasta`."""
+    remoto, repo = pasta / "remoto.git", pasta / "repo"
+
+    def git(*args, cwd=repo):
+        return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+    git("init", "-q", "--bare", "-b", publicador.RAMO, str(remoto), cwd=pasta)
+    git("init", "-q", "-b", publicador.RAMO, str(repo), cwd=pasta)
+    git("config", "user.name", "conferencia")
+    git("config", "user.email", "conferencia@localhost")
+    (repo / ".gitignore").write_text("*.tmp\n")
+    (repo / "README.md").write_text("painel\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "inicial")
+    git("remote", "add", publicador.REMOTO, str(remoto))
+    git("push", "-q", publicador.REMOTO, publicador.RAMO)
+    return repo, git
+
+
+def conferir_publicador() -> None:
+    """
+    publicar_git num repositório descartável: commit só com os KPIs, ramo
+    enxuto só com eles, rajada de pedidos num push só, push com falha
+    repetido e filtro de caminhos do _caminhos_existentes.
+    """
+    originais = (publicador.JANELA_AGRUPAR, publicador.ESPERA_INICIAL, publicador.publicar_git)
+    with tempfile.TemporaryDirectory(prefix="conferir_publicador_") as pasta:
+        repo, git = _repo_descartavel(Path(pasta))
+        publicados = publicador.CAMINHOS_PUBLICADOS
+
+        # caminhos: pasta vazia, só com ignorados e inexistente ficam de fora
+        (repo / publicados[0]).mkdir(parents=True)
+        (repo / publicados[0] / "a.tmp").write_text("ignorado")
+        (repo / publicados[1]).mkdir(parents=True, exist_ok=True)
+        try:
+            publicador._caminhos_existentes(repo, [*publicados, "nao_existe"])
+        except FileNotFoundError:
+            pass
+        else:
+            raise AssertionError("sem arquivo que o git conheça deveria gerar FileNotFoundError")
+        (repo / publicados[0] / "kpis.json").write_text("{}")
+        obtidos = publicador._caminhos_existentes(repo, [*publicados, "nao_existe"])
+        assert obtidos == [publicados[0]], obtidos
+
+        # commit no ramo atual: só os KPIs, o resto do stage fica como está
+        (repo / publicados[1] / "kpi.json").write_text("1")
+        (repo / "README.md").write_text("alterado\n")
+        git("add", "README.md")
+        assert publicador.publicar_git(repo)
+        tocados = git("show", "--name-only", "--format=", "HEAD").splitlines()
+        assert tocados and all(t.startswith(tuple(f"{c}/" for c in publicados)) for t in tocados), tocados
+        assert git("diff", "--cached", "--name-only") == "README.md"
+        assert git("rev-parse", "HEAD") == git("rev-parse", f"{publicador.REMOTO}/{publicador.RAMO}")
+        assert not publicador.ha_o_que_publicar(repo)
+
+        # ramo enxuto: árvore só com os KPIs, sem mexer no HEAD nem no índice
+        head = git("rev-parse", "HEAD")
+        assert publicador.publicar_git(repo, ramo_publicacao="painel-dados")
+        arvore = sorted(git("ls-tree", "-r", "--name-only", "painel-dados").splitlines())
+        assert arvore == sorted(git("ls-files", "--", *publicados).splitlines()), arvore
+        assert git("rev-parse", "HEAD") == head and git("diff", "--cached", "--name-only") == "README.md"
+        assert git("rev-parse", "painel-dados") == git("rev-parse", f"{publicador.REMOTO}/painel-dados")
+
+        chamadas = []
+
+        def publicar_contando(*args, **kwargs):
+            chamadas.append(time.monotonic())
+            return originais[2](*args, **kwargs)
+
+        publicador.JANELA_AGRUPAR, publicador.ESPERA_INICIAL = 0.3, 0.2
+        publicador.publicar_git = publicar_contando
+        try:
+            # rajada: N pedidos seguidos viram um commit e um push
+            for i in range(5):
+                (repo / publicados[1] / "kpi.json").write_text(str(i + 2))
+                publicador.solicitar_publicacao(repo)
+            assert publicador.aguardar(30), "fila não esvaziou"
+            assert len(chamadas) == 1, f"{len(chamadas)} publicações para uma rajada"
+            assert git("rev-parse", "HEAD") == git("rev-parse", f"{publicador.REMOTO}/{publicador.RAMO}")
+
+            # push com falha (remoto fora do ar) é repetido até passar
+            chamadas.clear()
+            url = git("remote", "get-url", publicador.REMOTO)
+            git("remote", "set-url", publicador.REMOTO, str(Path(pasta) / "fora_do_ar.git"))
+            (repo / publicados[1] / "kpi.json").write_text("falha")
+            publicador.solicitar_publicacao(repo)
+            limite = time.monotonic() + 30
+            while not publicador.status()["tentativa"] and time.monotonic() < limite:
+                time.sleep(0.05)
+            git("remote", "set-url", publicador.REMOTO, url)
+            assert publicador.aguardar(30), "fila não esvaziou"
+            assert len(chamadas) >= 2, "push com falha não foi repetido"
+            assert publicador.status()["ultimo_sucesso"]["momento"] > publicador.status()["ultimo_erro"]["momento"]
+            assert git("rev-parse", "HEAD") == git("rev-parse", f"{publicador.REMOTO}/{publicador.RAMO}")
+            assert git("show", f"{publicador.REMOTO}/{publicador.RAMO}:{publicados[1]}/kpi.json") == "falha"
+        finally:
+            publicador.JANELA_AGRUPAR, publicador.ESPERA_INICIAL, publicador.publicar_git = originais
+    print("publicador (commit só dos KPIs, ramo enxuto, rajada, nova tentativa): OK")
+
+
+# ===============================================================
+# TEMPOS
+# ===============================================================
+
+def medir(funcao, *args, repeticoes: int = 1) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao(*args)
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def benchmark_limpar_numero(tamanhos) -> list:
+    resultados = []
+    for n in tamanhos:
+        serie = pd.Series(gerar_corpus(n, semente=n), dtype=object)
+        t_escalar = medir(lambda s: s.apply(painel.limpar_numero), serie)
+        t_vetor = medir(painel.limpar_numero_serie, serie, repeticoes=3)
+        resultados.append({
+            "funcao": "limpar_numero",
+            "linhas": n,
+            "escalar_s": round(t_escalar, 4),
+            "vetorizado_s": round(t_vetor, 4),
+            "ganho": round(t_escalar / t_vetor, 1),
+        })
+        print(f"limpar_numero {n:>9,} linhas | apply {t_escalar:8.3f}s | "
+              f"vetorizado {t_vetor:8.3f}s | {t_escalar / t_vetor:5.1f}x")
+    return resultados
+
+
+# ===============================================================
+# PLANILHA SINTÉTICA PEDIDOS_<AAAA>.xlsx
+# ---------------------------------------------------------------
+# Mesmo layout do relatório de pedidos (47 colunas, A até AU), com a
+# bagunça que aparece no arquivo real:
+#   • Data: data do Excel (serial + formato), às vezes "dd/mm/aaaa"
+#     colado como texto e, nas linhas de continuação, só a hora
+#   • Valor Com IPI / Total m2 / Kg: número, "1.234,56", "R$ 1.234,56",
+#     "12.345" (milhar) e Kg que o Excel virou data (1900–1902)
+#   • Pedido: número, às vezes colado como texto pelo robô ("38724")
+#     ou sem número (#N/A de fórmula, "NA" em texto)
+#   • medidas também com "NA", erro de fórmula (#DIV/0!) e número em texto
+#   • Tipo de pedido misturando Normal/NORMAL com outros tipos
+#   • linhas de continuação deslocadas (motivo de bloqueio na 1ª coluna)
+# O xlsx é escrito direto em XML (sem openpyxl), com os textos em
+# sharedStrings como o Excel grava: 1M de linhas sai em poucos minutos.
+# ===============================================================
+
+COLUNAS_PEDIDOS = [
+    "Empresa/Filial", "Pedido", "Tipo", "Tipo de pedido", "Data", "Cliente", "Cidade",
+    "Valor Total", "Valor produto", "Valor Embalagem", "Valor Com IPI", "Total m2", "Kg",
+    "Nome representante", "Efetivado", "Análise coml", "Análise PCP", "Análise compra",
+    "Genérico", "Ped.Imp.Orç", "Rep", "Tele-venda", "Condição pagamento", "Transf.ICMS",
+    "Motivo não liberação financ", "M2 onda B", "M2 onda C", "M2 onda BC", "M2 onda E",
+    "M2 outros", "Quant. total", "Enviado mail", "Frete", "Cidade entrega", "Registrado por",
+    "Efetivado por", "Dt/hr efetivação", "Análise coml por", "Dt/hr análise coml",
+    "Classif. pedido", "Cons. final", "Número Ped. Rep.", "Número ped. preposto", "Cancelado",
+    "Bloq carreg/fat", "Cód. cliente", "Ped.Imp.Web",
+]
+
+LINHAS_POR_BLOCO = 50_000
+
+# tipo da célula → XML (s="1": data, s="2": data e hora, s="3": #,##0.00;
+# t="s": índice do texto em sharedStrings; t="e": erro de fórmula)
+_CELULA = {
+    "n": '<c r="{r}"><v>{v}</v></c>',
+    "m": '<c r="{r}" s="3"><v>{v}</v></c>',
+    "d": '<c r="{r}" s="1"><v>{v}</v></c>',
+    "h": '<c r="{r}" s="2"><v>{v}</v></c>',
+    "s": '<c r="{r}" t="s"><v>{v}</v></c>',
+    "b": '<c r="{r}" t="b"><v>{v}</v></c>',
+    "e": '<c r="{r}" t="e"><v>{v}</v></c>',
+    "": "",
+}
+
+_XML_FIXOS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '<Override PartName="/xl/sharedStrings.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/></Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Pedidos" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '<Relationship Id="rId3" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+        'Target="sharedStrings.xml"/></Relationships>'
+    ),
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="4">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '</cellXfs><cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+
+def _letra_coluna(i: int) -> str:
+    letras = ""
+    i += 1
+    while i:
+        i, resto = divmod(i - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _br(v: float) -> str:
+    return f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _medida_baguncada(rng, valores: np.ndarray, serial_data: bool):
+    """(tipos, textos) de uma coluna de medida com os formatos que a planilha real traz."""
+    sorteio = rng.random(len(valores))
+    tipos, textos = [], []
+    for v, r in zip(valores.tolist(), sorteio.tolist()):
+        if r < 0.55:
+            tipos.append("m"); textos.append(repr(round(v, 2)))
+        elif r < 0.75:
+            tipos.append("s"); textos.append(_br(v))                               # 1.234,56
+        elif r < 0.82:
+            tipos.append("s"); textos.append("R$ " + _br(v))
+        elif r < 0.88:
+            tipos.append("s"); textos.append(f"{int(v):,}".replace(",", "."))      # 12.345
+        elif r < 0.93:
+            tipos.append("s"); textos.append(f"{v:.2f}".replace(".", ","))         # 1234,56
+        elif r < 0.945:
+            tipos.append("s"); textos.append(" - ")
+        elif r < 0.95:
+            tipos.append("s"); textos.append(repr(round(v, 2)))                    # número em texto
+        elif r < 0.955:
+            tipos.append("s"); textos.append("NA")
+        elif r < 0.96:
+            tipos.append("e"); textos.append("#DIV/0!")
+        elif serial_data:
+            # Kg que o Excel formatou como data: o valor continua sendo o serial
+            tipos.append("h"); textos.append(repr(round(v % 1000 + 1, 6)))
+        else:
+            tipos.append(""); textos.append("")
+    return tipos, textos
+
+
+def _bloco_pedidos(rng, ano: int, dias: tuple, inicio: int, n: int, pools: dict):
+    """
+    Células de n linhas (a partir da linha `inicio` dos dados), coluna a
+    coluna: {índice da coluna: (tipos, textos)}. As datas caem no intervalo
+    de dias do ano `dias` = (primeiro, último), em ordem crescente.
+    """
+    def escolher(pool):
+        return [pool[i] for i in rng.integers(0, len(pool), n).tolist()]
+
+    def constante(tipo, texto):
+        return [tipo] * n, [texto] * n
+
+    continuacao = rng.random(n) < 0.03          # linha deslocada, sem pedido de verdade
+    serial_ano = (datetime(ano, 1, 1) - painel.EXCEL_EPOCH).days
+    dias = np.sort(rng.integers(dias[0], dias[1] + 1, n))
+    pedido = pools["primeiro_pedido"] + inicio + np.cumsum(rng.random(n) < 0.8)
+    valor = np.round(rng.lognormal(8.5, 1.1, n), 2)
+    kg = np.round(valor / rng.uniform(8, 18, n), 2)
+    m2 = np.round(kg * rng.uniform(1.5, 3.0, n), 1)
+
+    # Data: serial do Excel (83%), texto colado (12%), data e hora (3%), vazio (2%)
+    sorteio = rng.random(n).tolist()
+    tipos_data, textos_data = [], []
+    for d, r, cont in zip(dias.tolist(), sorteio, continuacao.tolist()):
+        if cont:
+            tipos_data.append("d"); textos_data.append("0")                       # hora 00:00
+        elif r < 0.83:
+            tipos_data.append("d"); textos_data.append(str(serial_ano + d))
+        elif r < 0.95:
+            dt = datetime(ano, 1, 1) + timedelta(days=d)
+            tipos_data.append("s"); textos_data.append(f"{dt:%d/%m/%Y}")
+        elif r < 0.98:
+            tipos_data.append("h"); textos_data.append(repr(serial_ano + d + round(r / 2, 6)))
+        else:
+            tipos_data.append(""); textos_data.append("")
+
+    # Pedido: número (95%), colado como texto pelo robô (4%), "NA" ou #N/A
+    tipos_num, textos_num = [], []
+    for p, r in zip(pedido.tolist(), rng.random(n).tolist()):
+        if r < 0.04:
+            tipos_num.append("s"); textos_num.append(str(p))
+        elif r < 0.045:
+            tipos_num.append("s"); textos_num.append("NA")
+        elif r < 0.05:
+            tipos_num.append("e"); textos_num.append("#N/A")
+        else:
+            tipos_num.append("m"); textos_num.append(str(p))
+
+    tipos_pedido = escolher(pools["tipos_pedido"])
+    cols = {
+        0: ("s", [pools["motivos"][0] if c else "ONDA DO VALE" for c in continuacao.tolist()]),
+        1: (tipos_num, textos_num),
+        2: ("s", escolher(["Caixas", "Chapas", "Acessórios"])),
+        3: ("s", [("1604.7" if c else t) for c, t in zip(continuacao.tolist(), tipos_pedido)]),
+        4: (tipos_data, textos_data),
+        5: ("s", escolher(pools["clientes"])),
+        6: ("s", escolher(pools["cidades"])),
+        7: ("m", [repr(v) for v in np.round(valor / 1.15, 2).tolist()]),
+        8: ("m", [repr(v) for v in np.round(valor / 1.15, 2).tolist()]),
+        9: constante("n", "0"),
+        10: _medida_baguncada(rng, valor, serial_data=False),
+        11: _medida_baguncada(rng, m2, serial_data=False),
+        12: _medida_baguncada(rng, kg, serial_data=True),
+        13: ("s", escolher(pools["representantes"])),
+        14: ("s", escolher(["True", "True", "True", "False"])),
+        15: constante("s", "True"),
+        16: ("s", escolher(["True", "False"])),
+        17: constante("s", "False"),
+        18: constante("b", "0"),
+        19: constante("s", "N"),
+        20: ("n", [str(v) for v in rng.integers(100, 140, n).tolist()]),
+        21: ("s", escolher(pools["televenda"])),
+        22: ("s", escolher(["35 DD", "28/35/42 DD", "À VISTA", "30/60 DD"])),
+        23: constante("n", "0"),
+        24: ("s", [pools["motivos"][1] if r < 0.05 else "" for r in rng.random(n).tolist()]),
+        25: ("n", [repr(v) for v in np.round(m2 * (rng.random(n) < 0.4), 1).tolist()]),
+        26: constante("n", "0"),
+        27: ("n", [repr(v) for v in np.round(m2 * (rng.random(n) < 0.4), 1).tolist()]),
+        28: constante("n", "0"),
+        29: constante("n", "0"),
+        30: ("n", [str(v) for v in (rng.integers(1, 50, n) * 100).tolist()]),
+        31: constante("b", "0"),
+        32: ("s", escolher(["CIF", "FOB"])),
+        33: ("s", escolher(pools["cidades"])),
+        34: ("s", escolher(pools["televenda"])),
+        35: ("s", escolher(pools["televenda"])),
+        36: ("h", [repr(round(serial_ano + d + 0.4 + r / 3, 6)) for d, r in zip(dias.tolist(), sorteio)]),
+        40: constante("b", "0"),
+        41: constante("n", "0"),
+        43: constante("b", "0"),
+        44: constante("b", "0"),
+        45: ("n", [str(v) for v in rng.integers(1000, 9999, n).tolist()]),
+        46: constante("s", "N"),
+    }
+    for i, (tipos, textos) in list(cols.items()):
+        if isinstance(tipos, str):
+            cols[i] = ([tipos] * n, textos)
+    return cols
+
+
+def _pools(rng, n: int, ano: int) -> dict:
+    """Valores repetidos (clientes, cidades...) — quantidade cresce com a planilha."""
+    silabas = ["MA", "RI", "CO", "PE", "LU", "SA", "TO", "VI", "NE", "BRA", "FLO", "ITA", "JOI", "BA"]
+
+    def nome(partes):
+        return "".join(rng.choice(silabas, partes))
+
+    clientes = sorted({f"{nome(3)} {rng.choice(['LTDA', 'EIRELI', 'S/A', 'ME', '& CIA'])}"
+                       for _ in range(max(50, min(n // 15, 8000)))})
+    return {
+        "primeiro_pedido": 10_000 + (ano - 2020) * 5_000,
+        "clientes": clientes,
+        "cidades": sorted({f"SC {nome(2)}{nome(1)}" for _ in range(max(30, min(n // 200, 600)))}),
+        "representantes": [f"{nome(2)} {nome(3)}" for _ in range(12)],
+        "televenda": ["CAROL", "BETUSA", "MARCOS", "JULIANA", "ANDRÉ"],
+        "tipos_pedido": ["Normal"] * 16 + ["NORMAL", "normal", "Bonificação", "Amostra", "Reposição", "Troca"],
+        "motivos": ["Cliente sem prazo médio.", "Data vallida do limite de crédito já passou."],
+    }
+
+
+def gerar_planilha_pedidos(caminho: Path, ano: int, linhas: int, semente: int = 42,
+                           dias_no_ano: int = None) -> Path:
+    """Grava PEDIDOS_<ano>.xlsx sintética com `linhas` linhas de dados."""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    dias_no_ano = dias_no_ano or (datetime(ano + 1, 1, 1) - datetime(ano, 1, 1)).days
+    rng = np.random.default_rng([semente, ano])
+    pools = _pools(rng, linhas, ano)
+    letras = [_letra_coluna(i) for i in range(len(COLUNAS_PEDIDOS))]
+    textos_compartilhados = {}     # texto → índice em sharedStrings.xml
+
+    def indices_textos(tipos, textos):
+        return [str(textos_compartilhados.setdefault(t, len(textos_compartilhados))) if tp == "s" else t
+                for tp, t in zip(tipos, textos)]
+
+    tmp = caminho.with_name(caminho.name + ".tmp")
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as z:
+        for nome, xml in _XML_FIXOS.items():
+            z.writestr(nome, xml)
+        with z.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as f:
+            def escrever(texto):
+                f.write(texto.encode("utf-8"))
+
+            escrever(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<dimension ref="A1:{letras[-1]}{linhas + 1}"/><sheetData><row r="1">'
+                + "".join(_CELULA["s"].format(r=f"{l}1", v=i)
+                          for l, i in zip(letras, indices_textos(["s"] * len(COLUNAS_PEDIDOS), COLUNAS_PEDIDOS)))
+                + "</row>"
+            )
+            for inicio in range(0, linhas, LINHAS_POR_BLOCO):
+                n = min(LINHAS_POR_BLOCO, linhas - inicio)
+                # datas crescem ao longo do arquivo, como no relatório real
+                dias = (dias_no_ano * inicio // linhas, dias_no_ano * (inicio + n) // linhas - 1)
+                cols = _bloco_pedidos(rng, ano, (dias[0], max(dias)), inicio, n, pools)
+                celulas = []
+                for i, (tipos, textos) in sorted(cols.items()):
+                    textos = indices_textos(tipos, textos)
+                    l = letras[i]
+                    celulas.append([
+                        _CELULA[tp].format(r=f"{l}{inicio + k + 2}", v=t) if tp and t != "" else ""
+                        for k, (tp, t) in enumerate(zip(tipos, textos))
+                    ])
+                escrever("".join(
+                    f'<row r="{inicio + k + 2}">' + "".join(linha) + "</row>"
+                    for k, linha in enumerate(zip(*celulas))
+                ))
+            escrever("</sheetData></worksheet>")
+
+        with z.open("xl/sharedStrings.xml", "w", force_zip64=True) as f:
+            n = len(textos_compartilhados)
+            f.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                     f'uniqueCount="{n}">').encode("utf-8"))
+            textos = list(textos_compartilhados)
+            for inicio in range(0, n, LINHAS_POR_BLOCO):
+                f.write("".join(
+                    f'<si><t xml:space="preserve">{escape(t)}</t></si>' for t in textos[inicio:inicio + LINHAS_POR_BLOCO]
+                ).encode("utf-8"))
+            f.write(b"</sst>")
+    os.replace(tmp, caminho)
+    return caminho
+
+
+# ===============================================================
+# SUÍTE: TEMPOS POR TAMANHO DE PLANILHA
+# ---------------------------------------------------------------
+# Para cada tamanho (linhas por planilha) mede:
+#   isolado   ler_excel (pd.read_excel inteiro), ler_planilha em cada
+#             motor do leitor_excel, tratar_planilha, limpar_numero (apply escalar
+#             e vetorizado), resumo e montar_indices/resumo_indices
+#   ponta     carregar_planilha e main() — frio (sem cache), cache em
+#             disco e quente (planilhas já em memória)
+# ===============================================================
+
+def planilhas_sinteticas(linhas: int, semente: int = 42) -> Path:
+    """Pasta com PEDIDOS_<ANO_BENCH> e do ano anterior; gera só na 1ª vez."""
+    pasta = PASTA_PLANILHAS / f"{linhas}_{semente}_v{VERSAO_GERADOR}"
+    for ano in (ANO_BENCH - 1, ANO_BENCH):
+        caminho = pasta / f"PEDIDOS_{ano}.xlsx"
+        if not caminho.exists():
+            t0 = time.perf_counter()
+            # ano corrente vai até o fim de outubro, como no meio do ano comercial
+            dias = 304 if ano == ANO_BENCH else None
+            gerar_planilha_pedidos(caminho, ano, linhas, semente, dias)
+            print(f"  gerada {caminho.name} ({linhas:,} linhas) em {time.perf_counter() - t0:.1f}s")
+    return pasta
+
+
+def versao_codigo() -> dict:
+    """Commit atual e se há alteração local não commitada."""
+    def git(*args):
+        r = subprocess.run(["git", *args], cwd=painel.BASE_DIR, capture_output=True, text=True)
+        return r.stdout.strip() if r.returncode == 0 else None
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "alteracoes_locais": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+@contextlib.contextmanager
+def painel_apontando_para(pasta_excel: Path):
+    """
+    main() lendo as planilhas sintéticas, com cache, log de execuções e
+    saída temporários. As pastas só são lidas no processo principal; os
+    processos do pool recebem a do cache por argumento (carregar_planilhas).
+    """
+    originais = (painel.EXCEL_DIR, painel.CACHE_DIR, painel.ARQ_LOG_EXECUCOES)
+    tmp = Path(tempfile.mkdtemp(prefix="bench_painel_"))
+    painel.EXCEL_DIR, painel.CACHE_DIR = Path(pasta_excel), tmp / "cache"
+    painel.ARQ_LOG_EXECUCOES = painel.CACHE_DIR / painel.ARQ_LOG_EXECUCOES.name
+    painel.esquecer_anos()
+    try:
+        yield tmp
+    finally:
+        painel.EXCEL_DIR, painel.CACHE_DIR, painel.ARQ_LOG_EXECUCOES = originais
+        painel.esquecer_anos()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def conferir_cache_isolado() -> None:
+    """
+    main() dentro de painel_apontando_para, com a carga no pool (spawn,
+    como no Windows), grava o cache na pasta temporária e nada no CACHE_DIR real.
+    """
+    pasta = planilhas_sinteticas(2_000)
+    real = painel.CACHE_DIR
+    antes = set(real.iterdir()) if real.exists() else set()
+    pode_paralelizar = painel.pode_paralelizar
+    painel.pode_paralelizar = lambda: True
+    try:
+        with painel_apontando_para(pasta) as tmp:
+            painel.main(recarregar=True, publicar=False, saida=tmp / "dados")
+            gravados = [p for p in (tmp / "cache").iterdir() if p.suffix in (".parquet", ".pkl")]
+    finally:
+        painel.pode_paralelizar = pode_paralelizar
+    novos = (set(real.iterdir()) if real.exists() else set()) - antes
+    assert len(gravados) == 2, gravados
+    assert not novos, f"cache real alterado: {sorted(p.name for p in novos)}"
+    print("cache das planilhas sintéticas na pasta temporária: OK")
+
+
+def imprimir_memoria(caminho: Path, bruto: pd.DataFrame) -> None:
+    """Memória do dataset tratado antes × depois de compactar_dataset (e do pd.read_excel cru)."""
+    instrumentacao.iniciar()
+    try:
+        painel.carregar_planilha(caminho)
+    finally:
+        medicoes = instrumentacao.encerrar()
+    memoria = next(m["memoria"] for m in medicoes if m["etapa"] == "compactar")
+    print(f"  memória — pd.read_excel com todas as colunas: {sum(painel.memoria_dataset(bruto).values()) / 1e6:.2f} MB")
+    print("    " + instrumentacao.formatar_memoria(memoria["antes"], memoria["depois"]).replace("\n", "\n    "))
+
+
+def suite(tamanhos, repeticoes: int = 3, semente: int = 42) -> list:
+    resultados = []
+
+    def anotar(funcao, modo, linhas, segundos, **extra):
+        resultados.append({"funcao": funcao, "modo": modo, "linhas": linhas,
+                           "segundos": round(segundos, 6), **extra})
+        print(f"  {funcao:<16} {modo:<14} {segundos:10.4f}s")
+
+    for n in tamanhos:
+        print(f"\n== {n:,} linhas por planilha ==")
+        pasta = planilhas_sinteticas(n, semente)
+        caminho = pasta / f"PEDIDOS_{ANO_BENCH}.xlsx"
+        # leitura do Excel é lenta e estável: uma passada só acima de 100k linhas
+        rep_excel = 1 if n > 100_000 else repeticoes
+
+        anotar("ler_excel", "isolado", n, medir(pd.read_excel, caminho, repeticoes=rep_excel))
+        for motor in leitor_excel.motores_disponiveis():
+            anotar("ler_planilha", motor, n, medir(painel.ler_linhas_excel, caminho, motor, repeticoes=rep_excel))
+        bruto = pd.read_excel(caminho)
+        anotar("tratar_planilha", "isolado", n, medir(lambda: painel.tratar_planilha(bruto.copy()), repeticoes=repeticoes))
+        anotar("carregar_planilha", "ponta", n, medir(painel.carregar_planilha, caminho, repeticoes=rep_excel))
+
+        coluna = painel.normalizar_colunas(bruto)["VALOR COM IPI"]
+        anotar("limpar_numero", "escalar", n, medir(lambda: coluna.apply(painel.limpar_numero)))
+        anotar("limpar_numero", "vetorizado", n, medir(painel.limpar_numero_serie, coluna, repeticoes=repeticoes))
+
+        df = painel.carregar_planilha(caminho)
+        imprimir_memoria(caminho, bruto)
+        fim = df["DATA"].max()
+        periodos = {"mes": (fim.replace(day=1), fim), "ano": (fim.replace(month=1, day=1), fim)}
+        for nome, (a, b) in periodos.items():
+            anotar("resumo", f"isolado_{nome}", n, medir(painel.resumo, df, a, b, repeticoes=repeticoes * 3))
+        anotar("montar_indices", "isolado", n, medir(painel.montar_indices, df, repeticoes=repeticoes))
+        indices = painel.montar_indices(df)
+        a, b = periodos["ano"]
+        anotar("resumo_indices", "isolado_ano", n, medir(painel.resumo_indices, indices, a, b, repeticoes=repeticoes * 3))
+
+        with painel_apontando_para(pasta) as tmp:
+            argumentos = {"publicar": False, "saida": tmp / "dados"}
+            anotar("main", "frio", n, medir(lambda: painel.main(recarregar=True, **argumentos)))
+            painel.esquecer_anos()
+            anotar("main", "cache_disco", n, medir(lambda: painel.main(**argumentos)))
+            anotar("main", "quente", n, medir(lambda: painel.main(**argumentos), repeticoes=repeticoes))
+
+    return resultados
+
+
+def salvar_resultados(resultados, arquivo: Path = ARQ_RESULTADOS) -> dict:
+    """Acrescenta os resultados (com commit e ambiente) em JSON lines."""
+    execucao = {
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        **versao_codigo(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpus": os.cpu_count(),
+    }
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    with open(arquivo, "a", encoding="utf-8") as f:
+        for r in resultados:
+            f.write(json.dumps({**execucao, **r}, ensure_ascii=False) + "\n")
+    print(f"\n{len(resultados)} medições em {arquivo} (commit {execucao['commit']}"
+          + (", com alterações locais)" if execucao["alteracoes_locais"] else ")"))
+    return execucao
+
+
+def comparar(referencia: str = None, arquivo: Path = ARQ_RESULTADOS) -> None:
+    """
+    Última execução × a mais recente de outro commit (ou do commit
+    `referencia`). Razão > 1 → ficou mais lento.
+    """
+    if not arquivo.exists():
+        print(f"Sem resultados em {arquivo}.")
+        return
+    with open(arquivo, encoding="utf-8") as f:
+        registros = [json.loads(linha) for linha in f if linha.strip()]
+    if not registros:
+        print(f"Sem resultados em {arquivo}.")
+        return
+
+    ultima = registros[-1]["quando"]
+    atual = [r for r in registros if r["quando"] == ultima]
+    commit_atual = atual[0]["commit"]
+    if referencia:
+        anteriores = [r for r in registros if (r["commit"] or "").startswith(referencia)]
+    else:
+        anteriores = [r for r in registros if r["commit"] != commit_atual]
+    if not anteriores:
+        print("Nenhuma execução de referência para comparar.")
+        return
+
+    # de cada medição, a execução mais recente da referência
+    base = {}
+    for r in anteriores:
+        base[(r["funcao"], r["modo"], r["linhas"])] = r
+    commit_base = anteriores[-1]["commit"]
+
+    print(f"{'função':<18} {'modo':<14} {'linhas':>10} {commit_base or '?':>10} {commit_atual or '?':>10} {'razão':>7}")
+    for r in atual:
+        b = base.get((r["funcao"], r["modo"], r["linhas"]))
+        if b is None:
+            continue
+        razao = r["segundos"] / b["segundos"] if b["segundos"] else float("inf")
+        marca = "  ← mais lento" if razao > 1.10 else ""
+        print(f"{r['funcao']:<18} {r['modo']:<14} {r['linhas']:>10,} {b['segundos']:10.4f} "
+              f"{r['segundos']:10.4f} {razao:7.2f}{marca}")
+
+
+# ===============================================================
+# EXECUÇÃO
+# ===============================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do painel comercial")
+    parser.add_argument("--linhas", type=int, nargs="+", default=ESCALAS,
+                        help="linhas por planilha sintética (padrão: 2k, 20k, 200k e 1M)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="melhor de N nas medições rápidas")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--sem-paridade", action="store_true", help="pula as conferências de resultado")
+    parser.add_argument("--nao-salvar", action="store_true", help="não grava em benchmark/resultados.jsonl")
+    parser.add_argument("--comparar", nargs="?", const="", metavar="COMMIT",
+                        help="só compara a última execução com outro commit (padrão: o anterior)")
+    args = parser.parse_args()
+
+    if args.comparar is not None:
+        comparar(args.comparar or None)
+    else:
+        if not args.sem_paridade:
+            conferir_paridade()
+            conferir_cubo()
+            conferir_motores()
+            conferir_virada_do_ano()
+            conferir_cache_isolado()
+            conferir_publicador()
+        resultados = suite(args.linhas, args.repeticoes, args.semente)
+        if not args.nao_salvar:
+            salvar_resultados(resultados)
+            comparar()
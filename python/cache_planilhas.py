@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+# ==========================================================
+# CACHE EM DISCO DAS PLANILHAS JÁ TRATADAS
+# ----------------------------------------------------------
+# Cada planilha tem uma entrada (identificada pelo caminho):
+#   <id>.json     → metadados (caminho, tamanho, mtime, sha256, formato)
+#   <id>.parquet  → DataFrame tratado (quando o pyarrow existe)
+#   <id>.pkl      → DataFrame tratado (fallback sem pyarrow)
+# ==========================================================
+try:
+    import pyarrow  # noqa: F401
+    TEM_PARQUET = True
+except ImportError:
+    TEM_PARQUET = False
+
+
+def hash_arquivo(caminho: Path) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _id_entrada(caminho: Path) -> str:
+    return hashlib.sha1(str(Path(caminho).resolve()).encode()).hexdigest()[:16]
+
+
+def _ler_meta(arq_meta: Path):
+    try:
+        with open(arq_meta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _arquivos_entrada(pasta: Path, caminho: Path):
+    ident = _id_entrada(caminho)
+    return pasta / f"{ident}.json", pasta / f"{ident}.parquet", pasta / f"{ident}.pkl"
+
+
+# ==========================================================
+# LER
+# ==========================================================
+def _carregar_df(pasta: Path, caminho: Path, meta: dict):
+    _, arq_parquet, arq_pkl = _arquivos_entrada(pasta, caminho)
+    arq_dados = arq_parquet if meta.get("formato") == "parquet" else arq_pkl
+    try:
+        if meta.get("formato") == "parquet":
+            df = pd.read_parquet(arq_dados)
+        else:
+            with open(arq_dados, "rb") as f:
+                df = pickle.load(f)
+    except Exception:
+        return None
+
+    # marca o uso (usado para descartar as entradas mais antigas)
+    os.utime(arq_dados)
+    return df
+
+
+def ler_cache(pasta: Path, caminho: Path, versao):
+    """
+    Devolve o DataFrame guardado para `caminho` ou None se não houver
+    entrada válida. A entrada vale enquanto tamanho + mtime baterem; se
+    só o mtime mudou (arquivo copiado/salvo sem alteração) o sha256 decide.
+    """
+    arq_meta = _arquivos_entrada(pasta, caminho)[0]
+    meta = _ler_meta(arq_meta)
+    if not meta or meta.get("versao") != versao:
+        return None
+
+    st = os.stat(caminho)
+    if meta.get("tamanho") != st.st_size:
+        return None
+
+    if meta.get("mtime_ns") != st.st_mtime_ns:
+        if meta.get("sha256") != hash_arquivo(caminho):
+            return None
+        meta["mtime_ns"] = st.st_mtime_ns
+        _gravar_meta(arq_meta, meta)
+
+    return _carregar_df(pasta, caminho, meta)
+
+
+def ler_entrada(pasta: Path, caminho: Path, versao):
+    """
+    (meta, DataFrame) da última entrada gravada para `caminho`, mesmo que a
+    planilha já tenha mudado depois — base da leitura incremental.
+    """
+    meta = _ler_meta(_arquivos_entrada(pasta, caminho)[0])
+    if not meta or meta.get("versao") != versao:
+        return None, None
+
+    df = _carregar_df(pasta, caminho, meta)
+    if df is None:
+        return None, None
+    return meta, df
+
+
+# ==========================================================
+# GRAVAR
+# ==========================================================
+def _gravar_atomico(destino: Path, escrever):
+    """
+    escrever(tmp) num temporário só deste processo/thread e troca de uma vez:
+    a prévia da interface e a atualização podem gravar a mesma entrada juntas.
+    """
+    tmp = destino.with_name(f".{destino.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        escrever(tmp)
+        os.replace(tmp, destino)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _gravar_meta(arq_meta: Path, meta: dict):
+    def escrever(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+    _gravar_atomico(arq_meta, escrever)
+
+
+def _gravar_pkl(tmp: Path, df: pd.DataFrame):
+    with open(tmp, "wb") as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def gravar_cache(pasta: Path, caminho: Path, df: pd.DataFrame, versao, limite_bytes=None, extra=None):
+    pasta.mkdir(parents=True, exist_ok=True)
+    arq_meta, arq_parquet, arq_pkl = _arquivos_entrada(pasta, caminho)
+
+    st = os.stat(caminho)
+    meta = {
+        "caminho": str(Path(caminho).resolve()),
+        "tamanho": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": hash_arquivo(caminho),
+        "versao": versao,
+        "linhas": len(df),
+    }
+    if extra:
+        meta.update(extra)
+
+    # parquet só aceita colunas de tipo único; colunas "misturadas"
+    # (texto + número) vindas direto do Excel caem no pickle
+    formato = "pkl"
+    if TEM_PARQUET:
+        try:
+            _gravar_atomico(arq_parquet, df.to_parquet)
+            formato = "parquet"
+        except Exception:
+            pass
+
+    if formato == "pkl":
+        _gravar_atomico(arq_pkl, lambda tmp: _gravar_pkl(tmp, df))
+        arq_parquet.unlink(missing_ok=True)
+    else:
+        arq_pkl.unlink(missing_ok=True)
+
+    meta["formato"] = formato
+    _gravar_meta(arq_meta, meta)
+
+    if limite_bytes:
+        limitar_tamanho(pasta, limite_bytes)
+
+
+# ==========================================================
+# LIMITE DE DISCO / LIMPEZA
+# ==========================================================
+def limitar_tamanho(pasta: Path, limite_bytes: int):
+    """Apaga as entradas usadas há mais tempo até caber no limite."""
+    if not pasta.exists():
+        return
+
+    dados = [p for p in pasta.iterdir() if p.suffix in (".parquet", ".pkl")]
+    total = sum(p.stat().st_size for p in dados)
+
+    for p in sorted(dados, key=lambda p: p.stat().st_mtime):
+        if total <= limite_bytes:
+            break
+        total -= p.stat().st_size
+        p.unlink(missing_ok=True)
+        p.with_suffix(".json").unlink(missing_ok=True)
+
+
+def limpar_cache(pasta: Path, caminho: Path = None):
+    """Remove a entrada de `caminho` (ou o cache inteiro se não informado)."""
+    if not pasta.exists():
+        return
+
+    if caminho is not None:
+        for p in _arquivos_entrada(pasta, caminho):
+            p.unlink(missing_ok=True)
+        return
+
+    for p in pasta.iterdir():
+        if p.suffix in (".json", ".parquet", ".pkl", ".tmp"):
+            p.unlink(missing_ok=True)
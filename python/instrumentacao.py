@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# ==========================================================
+# MEDIÇÃO POR ETAPA (tempo, CPU, linhas, pico de memória)
+# ----------------------------------------------------------
+#   iniciar()                      liga a medição nesta thread
+#   with etapa("nome", linhas):    mede um trecho (pode aninhar)
+#       reg["linhas_saida"] = n
+#   encerrar() → [registros]       desliga e devolve as medições
+#
+# Desligada, etapa() só devolve um dict vazio: custo de uma
+# chamada de função. Ligada, o tracemalloc fica ativo (o código
+# roda mais devagar — use para investigar, não no dia a dia).
+# ==========================================================
+_medicoes = None          # lista de registros enquanto a medição está ligada
+_pilha = []               # etapas abertas (para o pico de memória aninhado)
+_dono = None              # thread que ligou a medição
+_parar_tracemalloc = False
+
+
+def ligada() -> bool:
+    return _medicoes is not None and threading.get_ident() == _dono
+
+
+def iniciar():
+    global _medicoes, _dono, _parar_tracemalloc
+    _medicoes = []
+    _pilha.clear()
+    _dono = threading.get_ident()
+    _parar_tracemalloc = not tracemalloc.is_tracing()
+    if _parar_tracemalloc:
+        tracemalloc.start()
+
+
+def encerrar() -> list:
+    global _medicoes, _dono
+    medicoes, _medicoes, _dono = _medicoes or [], None, None
+    _pilha.clear()
+    if _parar_tracemalloc:
+        tracemalloc.stop()
+    return medicoes
+
+
+def anexar(registros, **extra):
+    """Junta medições feitas em outro processo (ex.: carga paralela)."""
+    if not ligada():
+        return
+    nivel = len(_pilha)
+    for reg in registros:
+        _medicoes.append({**reg, "nivel": reg["nivel"] + nivel, **extra})
+
+
+@contextmanager
+def etapa(nome: str, linhas_entrada=None):
+    if not ligada():
+        yield {}
+        return
+
+    # o pico da etapa de fora não pode se perder no reset_peak da de dentro
+    if _pilha:
+        _pilha[-1]["_pico"] = max(_pilha[-1]["_pico"], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+
+    reg = {"etapa": nome, "nivel": len(_pilha), "linhas_entrada": linhas_entrada, "linhas_saida": None, "_pico": 0}
+    _medicoes.append(reg)
+    _pilha.append(reg)
+    mem_inicio = tracemalloc.get_traced_memory()[0]
+    t0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        yield reg
+    finally:
+        reg["wall_s"] = round(time.perf_counter() - t0, 6)
+        reg["cpu_s"] = round(time.process_time() - cpu0, 6)
+        pico = max(reg.pop("_pico"), tracemalloc.get_traced_memory()[1])
+        reg["pico_mem_mb"] = round(pico / 1e6, 3)
+        reg["pico_extra_mb"] = round((pico - mem_inicio) / 1e6, 3)
+        _pilha.pop()
+        if _pilha:
+            _pilha[-1]["_pico"] = max(_pilha[-1]["_pico"], pico)
+
+
+# ==========================================================
+# LOG DE EXECUÇÕES (JSON lines, só acrescenta)
+# ==========================================================
+def registrar_execucao(arquivo: Path, registro: dict):
+    arquivo = Path(arquivo)
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    linha = {"quando": datetime.now().isoformat(timespec="seconds"), **registro}
+    with open(arquivo, "a", encoding="utf-8") as f:
+        f.write(json.dumps(linha, ensure_ascii=False, default=str) + "\n")
+
+
+def formatar_medicoes(medicoes) -> str:
+    linhas = [f"{'etapa':<34} {'wall s':>8} {'cpu s':>8} {'linhas ent.':>11} {'linhas saí.':>11} {'pico MB':>8}"]
+    for m in medicoes:
+        nome = "  " * m["nivel"] + m["etapa"]
+        ent = "" if m["linhas_entrada"] is None else f"{m['linhas_entrada']:,}"
+        sai = "" if m["linhas_saida"] is None else f"{m['linhas_saida']:,}"
+        linhas.append(f"{nome:<34} {m['wall_s']:8.3f} {m['cpu_s']:8.3f} {ent:>11} {sai:>11} {m['pico_mem_mb']:8.1f}")
+        if m.get("caminhos"):
+            contagens = ", ".join(f"{k} {v:,}" for k, v in m["caminhos"].items() if v)
+            linhas.append("  " * (m["nivel"] + 1) + f"caminhos: {contagens}")
+        if m.get("memoria"):
+            antes, depois = (sum(m["memoria"][k].values()) / 1e6 for k in ("antes", "depois"))
+            linhas.append("  " * (m["nivel"] + 1) + f"memória: {antes:.2f} MB → {depois:.2f} MB")
+    return "\n".join(linhas)
+
+
+def formatar_memoria(antes: dict, depois: dict) -> str:
+    """Tabela {coluna: bytes} antes × depois, com o total."""
+    linhas = [f"{'coluna':<24} {'antes MB':>10} {'depois MB':>10} {'razão':>7}"]
+
+    def linha(nome, a, d):
+        razao = f"{a / d:7.1f}" if a and d else f"{'':>7}"
+        a = f"{a / 1e6:10.3f}" if a is not None else f"{'—':>10}"
+        d = f"{d / 1e6:10.3f}" if d is not None else f"{'—':>10}"
+        return f"{nome:<24} {a} {d} {razao}"
+
+    for coluna in list(antes) + [c for c in depois if c not in antes]:
+        linhas.append(linha(coluna, antes.get(coluna), depois.get(coluna)))
+    linhas.append(linha("total", sum(antes.values()), sum(depois.values())))
+    return "\n".join(linhas)
@@ -2,18 +2,28 @@
 # PAINEL COMERCIAL - INTERFACE FINAL COM SEGURANÇA REAL
 # ===============================================================
 
+import time
+T0_INICIO = time.perf_counter()   # antes de qualquer import: base dos tempos de abertura
+
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, ttk
 from tkcalendar import DateEntry
-import subprocess
-import atualizar_painel_completo as painel
+import publicador
+import servico_painel
 from datetime import datetime
 import json
 import os
+import sys
 import hashlib
+import queue
 import random
+import threading
 from pathlib import Path
 
+# atualizar_painel_completo (pandas/openpyxl) só é importado em
+# modulo_painel(): a janela aparece antes e o import corre em segundo plano
+T_IMPORTS = time.perf_counter() - T0_INICIO
+
 # ===============================================================
 # CONFIGURAÇÕES
 # ===============================================================
@@ -25,6 +35,63 @@ ARQ_SENHAS_BACKUP = BASE_DIR / "senhas_backup.json"
 TENTATIVAS_MAX = 3
 tentativas = 0
 
+# no .exe o __file__ aponta para a pasta temporária do PyInstaller
+PASTA_EXECUTAVEL = Path(sys.executable).parent if getattr(sys, "frozen", False) else BASE_DIR
+ARQ_TEMPOS_INICIO = PASTA_EXECUTAVEL / "tempos_inicio.jsonl"
+
+
+# ===============================================================
+# CARGA SOB DEMANDA DO MÓDULO DE CÁLCULO + TEMPOS DE ABERTURA
+# ===============================================================
+
+_painel = None
+_lock_painel = threading.Lock()
+tempos_inicio = {"imports_s": round(T_IMPORTS, 4)}
+
+
+def modulo_painel():
+    """Importa atualizar_painel_completo na primeira vez que alguém precisa dele."""
+    global _painel
+    with _lock_painel:
+        if _painel is None:
+            t0 = time.perf_counter()
+            import atualizar_painel_completo
+            tempos_inicio["import_painel_s"] = round(time.perf_counter() - t0, 4)
+            _painel = atualizar_painel_completo
+    return _painel
+
+
+def aquecer_painel():
+    """Thread de fundo: importa o cálculo enquanto a senha é digitada e registra os tempos."""
+    try:
+        modulo_painel()
+        tempos_inicio["pronto_s"] = round(time.perf_counter() - T0_INICIO, 4)
+    except Exception as e:
+        tempos_inicio["erro"] = str(e)
+    registrar_tempos_inicio()
+
+
+def janela_desenhada():
+    tempos_inicio["primeira_janela_s"] = round(time.perf_counter() - T0_INICIO, 4)
+    threading.Thread(target=aquecer_painel, name="aquecimento", daemon=True).start()
+
+
+def registrar_tempos_inicio():
+    """Uma linha JSON por abertura, para comparar builds."""
+    executavel = Path(sys.executable)
+    linha = {
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        "frozen": bool(getattr(sys, "frozen", False)),
+        "python": sys.version.split()[0],
+        "build": datetime.fromtimestamp(executavel.stat().st_mtime).isoformat(timespec="seconds"),
+        **tempos_inicio,
+    }
+    try:
+        with open(ARQ_TEMPOS_INICIO, "a", encoding="utf-8") as f:
+            f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+    except OSError:
+        pass
+
 # ===============================================================
 # UTILIDADES DE SEGURANÇA
 # ===============================================================
@@ -141,7 +208,7 @@ def montar_resumo_por_json():
     """
     try:
         # usa o mesmo diretório de dados que o script painel usa
-        dados_dir = painel.DADOS_DIR_2
+        dados_dir = modulo_painel().DADOS_DIR_2
 
         # Faturamento → tem períodos e valores
         with open(dados_dir / "kpi_faturamento.json", "r", encoding="utf-8") as f:
@@ -176,9 +243,48 @@ def montar_resumo_por_json():
 
 # ===============================================================
 # EXECUTAR ATUALIZAÇÃO
+# ---------------------------------------------------------------
+# O cálculo roda numa thread de trabalho; ela só fala com a janela
+# pela fila_trabalho, que o Tk lê a cada INTERVALO_FILA_MS.
 # ===============================================================
 
+INTERVALO_FILA_MS = 100
+
+fila_trabalho = queue.Queue()
+cancelamento = threading.Event()
+trabalho = None
+
+
+def trabalho_atualizacao(data_ini, data_fim):
+    """Roda fora da thread do Tk — não mexe em widget nenhum."""
+    try:
+        fila_trabalho.put(("etapa", "Preparando"))
+        painel = modulo_painel()
+    except Exception as e:
+        fila_trabalho.put(("erro", e))
+        return
+
+    try:
+        # com o serviço residente no ar as planilhas já estão em memória lá
+        resultado = servico_painel.atualizar(
+            data_ini, data_fim,
+            publicar=False,
+            progresso=lambda etapa: fila_trabalho.put(("etapa", etapa)),
+            cancelar=cancelamento.is_set,
+        )
+        fila_trabalho.put(("fim", resultado))
+    except painel.AtualizacaoCancelada:
+        fila_trabalho.put(("cancelado", None))
+    except Exception as e:
+        fila_trabalho.put(("erro", e))
+
+
 def executar_atualizacao():
+    global trabalho
+
+    if trabalho is not None and trabalho.is_alive():
+        return
+
     # 🔐 Se ainda não liberou no mês, pede senha
     if not licenca_valida():
         senha_digitada = entry_senha.get().strip()
@@ -188,137 +294,337 @@ def executar_atualizacao():
             # senha ok → esconde bloco de autenticação
             frame_auth.pack_forget()
 
-    usar_auto = var_auto.get()
+    # datas lidas aqui: widgets só na thread do Tk
+    data_ini = data_fim = None
+    if not var_auto.get():
+        data_ini = entry_ini.get_date().strftime("%d/%m/%Y")
+        data_fim = entry_fim.get_date().strftime("%d/%m/%Y")
 
-    try:
-        # 1) Roda o cálculo e gera os JSONs
-        if usar_auto:
-            painel.main()
+    cancelamento.clear()
+    modo_execucao(True)
+    trabalho = threading.Thread(
+        target=trabalho_atualizacao, args=(data_ini, data_fim), name="atualizacao", daemon=True
+    )
+    trabalho.start()
+    janela.after(INTERVALO_FILA_MS, acompanhar_atualizacao)
+
+
+def acompanhar_atualizacao():
+    """Lê a fila da thread de trabalho (sempre na thread do Tk)."""
+    while True:
+        try:
+            tipo, valor = fila_trabalho.get_nowait()
+        except queue.Empty:
+            break
+
+        if tipo == "etapa":
+            lbl_etapa.config(text=f"{valor}...")
+            continue
+
+        modo_execucao(False)
+        if tipo == "fim":
+            concluir_atualizacao(valor)
+        elif tipo == "cancelado":
+            messagebox.showinfo("Cancelado", "Atualização interrompida. Nada foi enviado ao site.")
         else:
-            data_ini = entry_ini.get_date().strftime("%d/%m/%Y")
-            data_fim = entry_fim.get_date().strftime("%d/%m/%Y")
-            painel.main(data_ini, data_fim)
+            messagebox.showerror("Erro", f"Ocorreu um erro:\n{valor}")
+        return
+
+    janela.after(INTERVALO_FILA_MS, acompanhar_atualizacao)
+
+
+def concluir_atualizacao(resultado):
+    # 2) Monta o resumo lendo os JSONs
+    resumo = montar_resumo_por_json()
+    if not resumo:
+        return
+
+    mensagem = (
+        "ATUALIZAÇÃO CONCLUÍDA!\n\n"
+        f"■ Período atual: {resumo['periodo_atual']}\n"
+        f"■ Período anterior: {resumo['periodo_ant']}\n\n"
+        f"■ Pedidos 2026: {resumo['pedidos_2026']}\n"
+        f"■ Pedidos 2025: {resumo['pedidos_2025']}\n\n"
+        f"■ Faturamento 2026: R$ {resumo['fat_2026']:,.2f}\n"
+        f"■ Faturamento 2025: R$ {resumo['fat_2025']:,.2f}\n"
+    )
+
+    # 3) Git automático em segundo plano (status no rodapé da janela)
+    # pelo git, não só pelo que mudou agora: KPI que ficou sem enviar
+    # (push com falha, cancelamento) vai junto
+    if resultado.get("publicacao_pendente", resultado["alterados"]):
+        publicador.solicitar_publicacao(modulo_painel().BASE_DIR)
+        mensagem += "\nEnviando ao site em segundo plano..."
+    else:
+        mensagem += "\nNenhum KPI pendente — nada a enviar."
+
+    messagebox.showinfo("Resumo da Atualização", mensagem)
+
+
+def parar_atualizacao():
+    """Pede para parar; a thread para antes da próxima etapa."""
+    cancelamento.set()
+    lbl_etapa.config(text="Cancelando (aguardando a etapa atual terminar)...")
+    btn_cancelar.config(state="disabled")
+
+
+def modo_execucao(rodando: bool):
+    if rodando:
+        btn_atualizar.config(state="disabled")
+        btn_cancelar.config(text="Parar", command=parar_atualizacao, state="normal")
+        barra_progresso.start(15)
+    else:
+        btn_atualizar.config(state="normal")
+        btn_cancelar.config(text="Cancelar", command=fechar_janela, state="normal")
+        barra_progresso.stop()
+        lbl_etapa.config(text="")
 
-        # 2) Monta o resumo lendo os JSONs
-        resumo = montar_resumo_por_json()
-        if not resumo:
-            return
 
-        mensagem = (
-            "ATUALIZAÇÃO CONCLUÍDA!\n\n"
-            f"■ Período atual: {resumo['periodo_atual']}\n"
-            f"■ Período anterior: {resumo['periodo_ant']}\n\n"
-            f"■ Pedidos 2026: {resumo['pedidos_2026']}\n"
-            f"■ Pedidos 2025: {resumo['pedidos_2025']}\n\n"
-            f"■ Faturamento 2026: R$ {resumo['fat_2026']:,.2f}\n"
-            f"■ Faturamento 2025: R$ {resumo['fat_2025']:,.2f}\n"
-        )
+# ===============================================================
+# PRÉVIA DO PERÍODO PERSONALIZADO
+# ---------------------------------------------------------------
+# servico_painel.previa() usa os dados já em memória (no serviço
+# residente ou neste processo): a 1ª prévia carrega as planilhas
+# (em thread), as seguintes saem em milissegundos.
+# ===============================================================
 
-        messagebox.showinfo("Resumo da Atualização", mensagem)
+ATRASO_PREVIA_MS = 150
 
-        # 3) Git automático
-        subprocess.run(["git", "add", "."], shell=True)
-        subprocess.run(["git", "commit", "-m", "Atualização automática painel"], shell=True)
-        subprocess.run(["git", "push"], shell=True)
+fila_previa = queue.Queue()
+previa_agendada = None
+numero_previa = 0
 
-        messagebox.showinfo("Publicado", "Painel atualizado e enviado ao site!")
 
+def agendar_previa(event=None):
+    """Espera o usuário parar de mexer nas datas antes de calcular."""
+    global previa_agendada
+    if previa_agendada is not None:
+        janela.after_cancel(previa_agendada)
+    previa_agendada = janela.after(ATRASO_PREVIA_MS, disparar_previa)
+
+
+def disparar_previa():
+    global previa_agendada, numero_previa
+    previa_agendada = None
+
+    if var_auto.get():
+        lbl_previa.config(text="")
+        return
+    if not licenca_valida():
+        lbl_previa.config(text="Digite a senha para ver a prévia.")
+        return
+    if entry_ini.get_date() > entry_fim.get_date():
+        lbl_previa.config(text="Data inicial depois da final.")
+        return
+
+    numero_previa += 1
+    lbl_previa.config(text="Calculando prévia...")
+    threading.Thread(
+        target=trabalho_previa,
+        args=(numero_previa, entry_ini.get_date().strftime("%d/%m/%Y"), entry_fim.get_date().strftime("%d/%m/%Y")),
+        name="previa",
+        daemon=True,
+    ).start()
+
+
+def trabalho_previa(numero, data_ini, data_fim):
+    """
+    Calcula e já formata a prévia aqui: texto_previa importa o cálculo
+    (pandas), que não pode travar a thread do Tk na primeira prévia.
+    """
+    try:
+        fila_previa.put((numero, texto_previa(servico_painel.previa(data_ini, data_fim)), None))
     except Exception as e:
-        messagebox.showerror("Erro", f"Ocorreu um erro:\n{e}")
+        fila_previa.put((numero, None, e))
+
+
+def texto_previa(resultado) -> str:
+    atual, anterior = resultado["atual"], resultado["anterior"]
+    variacao = modulo_painel().variacao
+
+    def linha(rotulo, chave, formato):
+        return f"{rotulo}: {formato.format(atual[chave])} ({variacao(atual[chave], anterior[chave]):+.1f}%)"
+
+    return "\n".join([
+        f"Prévia {atual['inicio']} até {atual['fim']}",
+        f"(comparado a {anterior['inicio']} até {anterior['fim']})",
+        linha("Pedidos", "pedidos", "{:,}"),
+        linha("Faturamento", "fat", "R$ {:,.2f}"),
+        linha("KG", "kg", "{:,.2f}"),
+        linha("Ticket médio", "ticket", "R$ {:,.2f}"),
+    ])
+
+
+def acompanhar_previa():
+    """Mostra só a prévia mais recente; respostas atrasadas são descartadas."""
+    while True:
+        try:
+            numero, texto, erro = fila_previa.get_nowait()
+        except queue.Empty:
+            break
+        if numero != numero_previa:
+            continue
+        if erro is not None:
+            lbl_previa.config(text=f"Prévia indisponível:\n{erro}")
+        else:
+            lbl_previa.config(text=texto)
+
+    janela.after(INTERVALO_FILA_MS, acompanhar_previa)
+
+
+# ===============================================================
+# STATUS DA PUBLICAÇÃO
+# ===============================================================
+
+def texto_publicacao(st: dict) -> str:
+    if st["publicando"] and st["proxima_tentativa"]:
+        return f"Envio falhou ({st['ultimo_erro']['erro']}); nova tentativa em breve..."
+    if st["pendente"]:
+        return "Enviando ao site..."
+    ultimo_ok = st["ultimo_sucesso"]
+    ultimo_erro = st["ultimo_erro"]
+    if ultimo_erro and (not ultimo_ok or ultimo_erro["momento"] > ultimo_ok["momento"]):
+        return f"Falha no envio em {ultimo_erro['quando']}: {ultimo_erro['erro']}"
+    if ultimo_ok:
+        return f"Último envio ao site: {ultimo_ok['quando']}"
+    return ""
+
+
+def atualizar_status_publicacao():
+    lbl_publicacao.config(text=texto_publicacao(publicador.status()))
+    janela.after(1000, atualizar_status_publicacao)
+
+
+def fechar_janela():
+    if trabalho is not None and trabalho.is_alive():
+        if not messagebox.askyesno("Atualização em andamento", "Interromper a atualização e sair?"):
+            return
+        cancelamento.set()
+    elif publicador.status()["pendente"] and not messagebox.askyesno(
+        "Envio pendente", "O painel ainda está sendo enviado ao site.\nSair mesmo assim?"
+    ):
+        return
+    janela.destroy()
 
 
 # ===============================================================
 # INTERFACE
 # ===============================================================
 
-janela = tk.Tk()
-janela.title("PAINEL COMERCIAL - Atualização")
-janela.geometry("650x420")
-janela.resizable(False, False)
-
-titulo = tk.Label(
-    janela,
-    text="Atualização do Painel Comercial",
-    font=("Arial", 18, "bold")
-)
-titulo.pack(pady=10)
-
-# ---- AUTENTICAÇÃO ----
-frame_auth = tk.LabelFrame(janela, text="Autenticação", font=("Arial", 11, "bold"))
-
-if not licenca_valida():
-    frame_auth.pack(fill="x", padx=20, pady=10)
-
-tk.Label(
-    frame_auth,
-    text="Digite a senha mensal:",
-    font=("Arial", 11)
-).pack(anchor="w", padx=10, pady=5)
-
-entry_senha = tk.Entry(
-    frame_auth,
-    show="*",
-    width=30,
-    font=("Arial", 12)
-)
-entry_senha.pack(padx=10, pady=5)
-
-# ---- PERÍODO ----
-frame_periodo = tk.LabelFrame(
-    janela,
-    text="Período para Atualização",
-    font=("Arial", 11, "bold")
-)
-frame_periodo.pack(fill="x", padx=20, pady=10)
-
-var_auto = tk.BooleanVar(value=True)
-
-tk.Radiobutton(
-    frame_periodo,
-    text="Período Automático (01 → última data da planilha)",
-    variable=var_auto,
-    value=True,
-    font=("Arial", 11)
-).grid(row=0, column=0, sticky="w", padx=10)
-
-tk.Radiobutton(
-    frame_periodo,
-    text="Período Personalizado",
-    variable=var_auto,
-    value=False,
-    font=("Arial", 11)
-).grid(row=1, column=0, sticky="w", padx=10)
-
-tk.Label(frame_periodo, text="Data Inicial:", font=("Arial", 11)).grid(row=2, column=0, sticky="w", padx=10)
-entry_ini = DateEntry(frame_periodo, width=12, date_pattern="dd/mm/yyyy")
-entry_ini.grid(row=2, column=1, padx=10)
-
-tk.Label(frame_periodo, text="Data Final:", font=("Arial", 11)).grid(row=3, column=0, sticky="w", padx=10)
-entry_fim = DateEntry(frame_periodo, width=12, date_pattern="dd/mm/yyyy")
-entry_fim.grid(row=3, column=1, padx=10)
-
-# ---- BOTÕES ----
-frame_btn = tk.Frame(janela)
-frame_btn.pack(pady=20)
-
-btn_atualizar = tk.Button(
-    frame_btn,
-    text="Iniciar Atualização",
-    font=("Arial", 13, "bold"),
-    bg="#0a74d4",
-    fg="white",
-    width=20,
-    command=executar_atualizacao
-)
-btn_atualizar.grid(row=0, column=0, padx=10)
-
-btn_cancelar = tk.Button(
-    frame_btn,
-    text="Cancelar",
-    font=("Arial", 13),
-    width=15,
-    command=janela.destroy
-)
-btn_cancelar.grid(row=0, column=1, padx=10)
-
-janela.mainloop()
\ No newline at end of file
+# o guard evita abrir a janela de novo quando um processo filho
+# (carga paralela das planilhas) reimporta este módulo no Windows
+if __name__ == "__main__":
+    janela = tk.Tk()
+    janela.title("PAINEL COMERCIAL - Atualização")
+    janela.geometry("650x600")
+    janela.resizable(False, False)
+
+    titulo = tk.Label(
+        janela,
+        text="Atualização do Painel Comercial",
+        font=("Arial", 18, "bold")
+    )
+    titulo.pack(pady=10)
+
+    # ---- AUTENTICAÇÃO ----
+    frame_auth = tk.LabelFrame(janela, text="Autenticação", font=("Arial", 11, "bold"))
+
+    if not licenca_valida():
+        frame_auth.pack(fill="x", padx=20, pady=10)
+
+    tk.Label(
+        frame_auth,
+        text="Digite a senha mensal:",
+        font=("Arial", 11)
+    ).pack(anchor="w", padx=10, pady=5)
+
+    entry_senha = tk.Entry(
+        frame_auth,
+        show="*",
+        width=30,
+        font=("Arial", 12)
+    )
+    entry_senha.pack(padx=10, pady=5)
+
+    # ---- PERÍODO ----
+    frame_periodo = tk.LabelFrame(
+        janela,
+        text="Período para Atualização",
+        font=("Arial", 11, "bold")
+    )
+    frame_periodo.pack(fill="x", padx=20, pady=10)
+
+    var_auto = tk.BooleanVar(value=True)
+
+    tk.Radiobutton(
+        frame_periodo,
+        text="Período Automático (01 → última data da planilha)",
+        variable=var_auto,
+        value=True,
+        font=("Arial", 11),
+        command=agendar_previa
+    ).grid(row=0, column=0, sticky="w", padx=10)
+
+    tk.Radiobutton(
+        frame_periodo,
+        text="Período Personalizado",
+        variable=var_auto,
+        value=False,
+        font=("Arial", 11),
+        command=agendar_previa
+    ).grid(row=1, column=0, sticky="w", padx=10)
+
+    tk.Label(frame_periodo, text="Data Inicial:", font=("Arial", 11)).grid(row=2, column=0, sticky="w", padx=10)
+    entry_ini = DateEntry(frame_periodo, width=12, date_pattern="dd/mm/yyyy")
+    entry_ini.grid(row=2, column=1, padx=10)
+
+    tk.Label(frame_periodo, text="Data Final:", font=("Arial", 11)).grid(row=3, column=0, sticky="w", padx=10)
+    entry_fim = DateEntry(frame_periodo, width=12, date_pattern="dd/mm/yyyy")
+    entry_fim.grid(row=3, column=1, padx=10)
+
+    for entry in (entry_ini, entry_fim):
+        entry.bind("<<DateEntrySelected>>", agendar_previa)
+        entry.bind("<KeyRelease>", agendar_previa)
+
+    # ---- PRÉVIA ----
+    lbl_previa = tk.Label(janela, text="", font=("Arial", 10), justify="left")
+    lbl_previa.pack(fill="x", padx=30)
+
+    # ---- BOTÕES ----
+    frame_btn = tk.Frame(janela)
+    frame_btn.pack(pady=20)
+
+    btn_atualizar = tk.Button(
+        frame_btn,
+        text="Iniciar Atualização",
+        font=("Arial", 13, "bold"),
+        bg="#0a74d4",
+        fg="white",
+        width=20,
+        command=executar_atualizacao
+    )
+    btn_atualizar.grid(row=0, column=0, padx=10)
+
+    btn_cancelar = tk.Button(
+        frame_btn,
+        text="Cancelar",
+        font=("Arial", 13),
+        width=15,
+        command=fechar_janela
+    )
+    btn_cancelar.grid(row=0, column=1, padx=10)
+
+    # ---- PROGRESSO ----
+    barra_progresso = ttk.Progressbar(janela, mode="indeterminate", length=400)
+    barra_progresso.pack()
+    lbl_etapa = tk.Label(janela, text="", font=("Arial", 10))
+    lbl_etapa.pack()
+
+    lbl_publicacao = tk.Label(janela, text="", font=("Arial", 9), fg="#555555")
+    lbl_publicacao.pack(side="bottom", pady=5)
+
+    janela.protocol("WM_DELETE_WINDOW", fechar_janela)
+    atualizar_status_publicacao()
+    acompanhar_previa()
+    janela.after_idle(janela_desenhada)
+    janela.mainloop()
\ No newline at end of file
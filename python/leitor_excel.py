@@ -0,0 +1,243 @@
+import math
+import warnings
+from datetime import date, datetime
+from pathlib import Path
+
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string
+
+try:
+    # parte interna do openpyxl: sem ela, ler_planilha cai no pd.read_excel
+    from openpyxl.worksheet._reader import WorkSheetParser
+except ImportError:
+    WorkSheetParser = None
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# ==========================================================
+# LEITURA DAS PLANILHAS — motor plugável + projeção de colunas
+# ----------------------------------------------------------
+#   ler_planilha(caminho, projetar, motor) → (colunas, linhas)
+#     colunas  cabeçalho com os nomes que o pd.read_excel daria
+#              ("Unnamed: n" para vazio, ".1" para repetido)
+#     linhas   tuplas só com as colunas de projetar(colunas), com os
+#              valores que o pd.read_excel tira das células: vazio e
+#              erro (#DIV/0!, #N/A...) → None, número inteiro → int
+#
+# Motores:
+#   openpyxl  read-only em streaming; só as células das colunas
+#             projetadas são convertidas — as outras são puladas
+#             no XML (mesmo conversor do openpyxl → mesmos valores).
+#             Usa partes internas do openpyxl; se uma versão nova
+#             mudar alguma, a leitura cai no pd.read_excel(usecols=...)
+#   calamine  python-calamine (leitor em Rust), se instalado
+#   auto      calamine se instalado, senão openpyxl
+# ==========================================================
+MOTORES = ("openpyxl", "calamine")
+
+_DIGITOS = "0123456789"
+
+
+def motores_disponiveis() -> list:
+    return [m for m in MOTORES if m != "calamine" or CalamineWorkbook is not None]
+
+
+def escolher_motor(motor: str = "auto") -> str:
+    """Nome do motor que vai ser usado; calamine sem o pacote cai no openpyxl."""
+    motor = (motor or "auto").lower()
+    if motor not in MOTORES + ("auto",):
+        raise ValueError(f"motor de leitura desconhecido: {motor!r} (use {', '.join(MOTORES)} ou auto)")
+    if motor in ("auto", "calamine"):
+        return "calamine" if CalamineWorkbook is not None else "openpyxl"
+    return motor
+
+
+def nomes_colunas(cabecalho) -> list:
+    """Mesmos nomes que o pd.read_excel daria ao cabeçalho."""
+    colunas = []
+    for i, nome in enumerate(cabecalho):
+        nome = f"Unnamed: {i}" if nome is None else nome
+        base, n = nome, 1
+        while nome in colunas:
+            nome = f"{base}.{n}"
+            n += 1
+        colunas.append(nome)
+    return colunas
+
+
+# ==========================================================
+# MOTOR openpyxl (streaming com projeção)
+# ==========================================================
+class _ParserProjetado(WorkSheetParser or object):
+    """
+    WorkSheetParser do openpyxl que só converte as células cujas colunas
+    (1 = A) estão em `colunas`. colunas=None → linha inteira (cabeçalho).
+    """
+    colunas = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._letras = {}      # "AB" → 28
+
+    def parse_row(self, row):
+        if self.colunas is None:
+            return super().parse_row(row)
+
+        r = row.get("r")
+        if r is not None:
+            self.row_counter = int(r) if r.isdigit() else int(float(r))
+        else:
+            self.row_counter += 1
+        self.col_counter = 0
+
+        celulas = []
+        for el in row:
+            ref = el.get("r")
+            if ref is None:
+                # sem coordenada: o próprio openpyxl conta a posição
+                celula = self.parse_cell(el)
+                if celula["column"] in self.colunas:
+                    celulas.append(celula)
+                continue
+            letras = ref.rstrip(_DIGITOS)
+            coluna = self._letras.get(letras)
+            if coluna is None:
+                coluna = self._letras[letras] = column_index_from_string(letras)
+            self.col_counter = coluna
+            if coluna in self.colunas:
+                celulas.append(self.parse_cell(el))
+        return self.row_counter, celulas
+
+
+def _linhas_openpyxl(caminho: Path, projetar):
+    if WorkSheetParser is None:
+        raise ImportError("openpyxl sem openpyxl.worksheet._reader.WorkSheetParser")
+    wb = load_workbook(caminho, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        with ws._get_source() as fonte:
+            parser = _ParserProjetado(
+                fonte, ws._shared_strings, data_only=True, epoch=wb.epoch,
+                date_formats=wb._date_formats, timedelta_formats=wb._timedelta_formats,
+            )
+            indices = None
+            esperada = 2           # próxima linha de dados (a 1 é o cabeçalho)
+            for numero, celulas in parser.parse():
+                if indices is None:
+                    # cabeçalho lido inteiro; daqui em diante só as colunas projetadas
+                    cabecalho = []
+                    if numero == 1:
+                        cabecalho = [None] * max((c["column"] for c in celulas), default=0)
+                        for c in celulas:
+                            cabecalho[c["column"] - 1] = c["value"]
+                    colunas = nomes_colunas(cabecalho)
+                    indices = _indices_projetados(colunas, projetar)
+                    parser.colunas = {i + 1 for i in indices}
+                    yield colunas, indices
+                    if numero == 1:
+                        continue
+                if numero < esperada:
+                    continue
+
+                for _ in range(esperada, numero):
+                    yield (None,) * len(indices)       # linha que não existe no XML
+                valores = {}
+                for c in celulas:
+                    v = c["value"]
+                    if c["data_type"] == "e":
+                        v = None
+                    elif v.__class__ is float and v.is_integer():
+                        v = int(v)
+                    valores[c["column"]] = v
+                yield tuple(valores.get(i + 1) for i in indices)
+                esperada = numero + 1
+
+            if indices is None:
+                yield [], []
+    finally:
+        wb.close()
+
+
+def _linhas_pandas(caminho: Path, projetar):
+    """Reserva do motor openpyxl: pd.read_excel só com as colunas projetadas, sem conversão."""
+    import pandas as pd
+
+    colunas = list(pd.read_excel(caminho, nrows=0).columns)
+    indices = _indices_projetados(colunas, projetar)
+    yield colunas, indices
+    if not indices:
+        return
+    # dtype=object + na_filter=False: os valores das células como o openpyxl
+    # entrega ("" no vazio, NaN no erro), sem inferência nem na_values
+    df = pd.read_excel(caminho, usecols=indices, dtype=object, na_filter=False)
+    for linha in df.itertuples(index=False, name=None):
+        yield tuple(None if v == "" or (isinstance(v, float) and math.isnan(v)) else v for v in linha)
+
+
+# ==========================================================
+# MOTOR calamine
+# ==========================================================
+def _valor_calamine(v):
+    """Valor do calamine no mesmo tipo que o openpyxl entrega."""
+    if isinstance(v, str):
+        return None if v == "" else v
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    if isinstance(v, date) and not isinstance(v, datetime):
+        return datetime(v.year, v.month, v.day)
+    return v
+
+
+def _linhas_calamine(caminho: Path, projetar):
+    folha = CalamineWorkbook.from_path(str(caminho)).get_sheet_by_index(0)
+    linhas = iter(folha.iter_rows())
+    cabecalho = [_valor_calamine(v) for v in next(linhas, [])]
+    while cabecalho and cabecalho[-1] is None:
+        cabecalho.pop()
+    colunas = nomes_colunas(cabecalho)
+    indices = _indices_projetados(colunas, projetar)
+    yield colunas, indices
+    for linha in linhas:
+        largura = len(linha)
+        yield tuple(_valor_calamine(linha[i]) if i < largura else None for i in indices)
+
+
+# ==========================================================
+# ENTRADA
+# ==========================================================
+def _indices_projetados(colunas, projetar) -> list:
+    return list(range(len(colunas))) if projetar is None else sorted(projetar(colunas))
+
+
+_LEITORES = {"openpyxl": _linhas_openpyxl, "calamine": _linhas_calamine}
+
+# o que uma mudança interna do openpyxl provoca (atributo/módulo/assinatura)
+_ERROS_INTERNOS = (AttributeError, ImportError, TypeError)
+
+
+def _ler(leitor):
+    colunas, indices = next(leitor)
+    return colunas, indices, list(leitor)
+
+
+def ler_planilha(caminho: Path, projetar=None, motor: str = "auto"):
+    """
+    (colunas, linhas) da 1ª aba. projetar(colunas) → índices das colunas
+    a manter (None = todas); as colunas devolvidas já vêm projetadas.
+    Linhas vazias no fim são descartadas.
+    """
+    caminho, motor = Path(caminho), escolher_motor(motor)
+    try:
+        colunas, indices, linhas = _ler(_LEITORES[motor](caminho, projetar))
+    except _ERROS_INTERNOS as e:
+        if motor != "openpyxl":
+            raise
+        warnings.warn(f"leitor projetado do openpyxl indisponível ({type(e).__name__}: {e}); "
+                      "usando pd.read_excel", RuntimeWarning, stacklevel=2)
+        colunas, indices, linhas = _ler(_linhas_pandas(caminho, projetar))
+    while linhas and all(v is None for v in linhas[-1]):
+        linhas.pop()
+    return [colunas[i] for i in indices], linhas
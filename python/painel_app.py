@@ -1,10 +1,11 @@
 import tkinter as tk
 from tkinter import messagebox
 from datetime import datetime
-import subprocess
 import os
 import sys
 
+import pipeline
+
 # ===============================
 # CONFIGURAÇÕES
 # ===============================
@@ -44,16 +45,16 @@ def verificar_senha():
 
 def executar_atualizacao(data_ini, data_fim):
     try:
-        comando = ["python", "python/atualizar_painel_completo.py"]
-
-        if data_ini and data_fim:
-            comando.append(data_ini)
-            comando.append(data_fim)
+        relatorio = pipeline.atualizar_painel(data_ini, data_fim)
 
-        subprocess.run(comando)
-
-        messagebox.showinfo("Sucesso",
-                            "Painel atualizado com sucesso!")
+        if relatorio["ok"]:
+            messagebox.showinfo("Sucesso",
+                                "Painel atualizado com sucesso!\n\n"
+                                + pipeline.formatar_relatorio(relatorio))
+        else:
+            messagebox.showerror("Erro",
+                                 "Falha na atualização:\n\n"
+                                 + pipeline.formatar_relatorio(relatorio))
 
     except Exception as e:
         messagebox.showerror("Erro", str(e))
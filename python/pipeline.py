@@ -0,0 +1,143 @@
+# ===============================================================
+# PIPELINE EM PROCESSO
+# ---------------------------------------------------------------
+# Etapas com nome, dependências e um estado (dict) compartilhado,
+# tudo no mesmo interpretador — sem subprocess por etapa.
+#
+# Cada etapa é uma função f(estado) que pode devolver um dict para
+# atualizar o estado. Etapa com erro não derruba as outras: só as
+# que dependem dela são puladas. O relatório traz tempo e status
+# de cada etapa.
+# ===============================================================
+
+import time
+import traceback
+from pathlib import Path
+
+import publicador
+import servico_painel
+
+
+class ErroPipeline(Exception):
+    """Definição inválida: dependência desconhecida, ciclo ou nome repetido."""
+
+
+def etapa(nome: str, funcao, depende=()) -> dict:
+    return {"nome": nome, "funcao": funcao, "depende": tuple(depende)}
+
+
+def ordenar_etapas(etapas) -> list:
+    """Ordem de execução respeitando as dependências (e a ordem declarada)."""
+    por_nome = {}
+    for e in etapas:
+        if e["nome"] in por_nome:
+            raise ErroPipeline(f"etapa repetida: {e['nome']}")
+        por_nome[e["nome"]] = e
+
+    ordem, visitando, feitas = [], set(), set()
+
+    def visitar(nome, caminho):
+        if nome in feitas:
+            return
+        if nome not in por_nome:
+            raise ErroPipeline(f"{caminho[-1]} depende de etapa inexistente: {nome}")
+        if nome in visitando:
+            raise ErroPipeline("dependência circular: " + " → ".join(caminho + [nome]))
+        visitando.add(nome)
+        for dep in por_nome[nome]["depende"]:
+            visitar(dep, caminho + [nome])
+        visitando.discard(nome)
+        feitas.add(nome)
+        ordem.append(por_nome[nome])
+
+    for e in etapas:
+        visitar(e["nome"], [])
+    return ordem
+
+
+def executar_pipeline(etapas, estado: dict = None, progresso=None) -> dict:
+    """
+    Roda as etapas e devolve o relatório:
+      {"ok", "total_s", "estado", "etapas": [{"nome", "status", "segundos", "erro"}]}
+    status: "ok", "erro" ou "pulada" (alguma dependência não terminou bem).
+    """
+    estado = {} if estado is None else estado
+    relatorio, status = [], {}
+    t_total = time.perf_counter()
+
+    for e in ordenar_etapas(etapas):
+        falhas = [d for d in e["depende"] if status[d] != "ok"]
+        if falhas:
+            status[e["nome"]] = "pulada"
+            relatorio.append({"nome": e["nome"], "status": "pulada", "segundos": 0.0,
+                              "erro": "dependência sem sucesso: " + ", ".join(falhas)})
+            continue
+
+        if progresso is not None:
+            progresso(e["nome"])
+        t0 = time.perf_counter()
+        try:
+            saida = e["funcao"](estado)
+            if saida:
+                estado.update(saida)
+            status[e["nome"]] = "ok"
+            erro = None
+        except Exception as ex:
+            status[e["nome"]] = "erro"
+            erro = f"{type(ex).__name__}: {ex}"
+            estado.setdefault("tracebacks", {})[e["nome"]] = traceback.format_exc()
+
+        relatorio.append({"nome": e["nome"], "status": status[e["nome"]],
+                          "segundos": round(time.perf_counter() - t0, 4), "erro": erro})
+
+    return {
+        "ok": all(s == "ok" for s in status.values()),
+        "total_s": round(time.perf_counter() - t_total, 4),
+        "estado": estado,
+        "etapas": relatorio,
+    }
+
+
+def formatar_relatorio(relatorio: dict) -> str:
+    linhas = []
+    for r in relatorio["etapas"]:
+        marca = {"ok": "OK  ", "erro": "ERRO", "pulada": "----"}[r["status"]]
+        linha = f"[{marca}] {r['nome']:<12} {r['segundos']:8.3f}s"
+        if r["erro"]:
+            linha += f"  {r['erro']}"
+        linhas.append(linha)
+    linhas.append(f"Total: {relatorio['total_s']:.3f}s")
+    return "\n".join(linhas)
+
+
+# ===============================================================
+# PIPELINE DO PAINEL
+# ===============================================================
+
+def _calcular(estado):
+    # preço médio já sai do main() (kpi_preco_medio.json); a publicação é a próxima etapa
+    resultado = servico_painel.atualizar(estado.get("data_inicio"), estado.get("data_fim"), publicar=False)
+    return {"resultado": resultado}
+
+
+def _publicar(estado):
+    if not estado["resultado"].get("publicacao_pendente", estado["resultado"]["alterados"]):
+        return {"publicado": None}   # git já tem tudo publicado → nada a enviar
+    repo = estado.get("repo")
+    if repo is None:
+        import atualizar_painel_completo as painel
+        repo = painel.BASE_DIR
+    return {"publicado": publicador.publicar_git(Path(repo))}
+
+
+def etapas_painel(publicar: bool = True) -> list:
+    etapas = [etapa("calcular", _calcular)]
+    if publicar:
+        etapas.append(etapa("publicar", _publicar, depende=["calcular"]))
+    return etapas
+
+
+def atualizar_painel(data_inicio=None, data_fim=None, publicar: bool = True, progresso=None) -> dict:
+    """Calcula os KPIs e publica só se há KPI sem publicar. Devolve o relatório do pipeline."""
+    estado = {"data_inicio": data_inicio, "data_fim": data_fim}
+    return executar_pipeline(etapas_painel(publicar), estado, progresso)
@@ -0,0 +1,257 @@
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# ==========================================================
+# PUBLICAÇÃO EM SEGUNDO PLANO (git add / commit / push)
+# ----------------------------------------------------------
+# Só os KPIs gerados são publicados (CAMINHOS_PUBLICADOS), então o
+# custo por atualização não cresce com o resto da pasta.
+# Quem calcula só pede a publicação (solicitar_publicacao) e
+# segue em frente; uma thread única faz o git fora desse caminho:
+#   • pedidos em rajada viram um único commit (JANELA_AGRUPAR)
+#   • push com falha é repetido com espera crescente
+#   • status() informa pendência, último sucesso e último erro
+# ==========================================================
+REMOTO = "origin"
+RAMO = "main"
+MENSAGEM_COMMIT = "Atualização automática painel"
+
+# só os KPIs gerados entram no commit (nada de build/, xlsx, .exe...)
+CAMINHOS_PUBLICADOS = ["site/dados", "dados"]
+# None → commit no RAMO atual; um nome (ex.: "painel-dados") → ramo enxuto
+# só com os KPIs, montado por índice temporário sem checkout
+RAMO_PUBLICACAO = None
+
+JANELA_AGRUPAR = 2.0      # segundos sem pedido novo antes de publicar
+ESPERA_INICIAL = 5.0      # segundos até a 1ª nova tentativa (dobra a cada falha)
+ESPERA_MAXIMA = 300.0
+MAX_TENTATIVAS = 6
+
+# sem janela de console piscando quando roda dentro do .exe
+_SEM_JANELA = getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+
+
+def _agora() -> str:
+    return datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+
+
+# ==========================================================
+# GIT
+# ==========================================================
+def _git(repo: Path, *args, check: bool = True, env: dict = None):
+    r = subprocess.run(
+        ["git", *args], cwd=repo, capture_output=True, text=True, creationflags=_SEM_JANELA,
+        env={**os.environ, **env} if env else None,
+    )
+    if check and r.returncode != 0:
+        raise RuntimeError(f"git {args[0]}: {(r.stderr or r.stdout).strip()}")
+    return r
+
+
+def _caminhos_existentes(repo: Path, caminhos, env: dict = None) -> list:
+    """
+    Só os caminhos que o git conhece (no índice ou novos fora do .gitignore):
+    pasta vazia ou só com ignorados faria o pathspec do add/commit falhar.
+    """
+    existentes = [
+        c for c in caminhos
+        if _git(repo, "ls-files", "--cached", "--others", "--exclude-standard", "--", c, env=env).stdout.strip()
+    ]
+    if not existentes:
+        raise FileNotFoundError(f"Nada para publicar em {repo}: {', '.join(caminhos)}")
+    return existentes
+
+
+def _commit_escopo(repo: Path, mensagem: str, caminhos) -> bool:
+    """Commit no ramo atual só com `caminhos` (o resto do stage fica como está)."""
+    _git(repo, "add", "-A", "--", *caminhos)
+    if _git(repo, "diff", "--cached", "--quiet", "--", *caminhos, check=False).returncode == 0:
+        return False
+    _git(repo, "commit", "-m", mensagem, "--", *caminhos)
+    return True
+
+
+def _arvore_enxuta(repo: Path, caminhos, ramo: str) -> str:
+    """Árvore só com `caminhos`, montada num índice temporário (o do repositório fica intacto)."""
+    indice = Path(_git(repo, "rev-parse", "--git-path", f"index-{ramo}").stdout.strip())
+    if not indice.is_absolute():
+        indice = Path(repo) / indice
+    env = {"GIT_INDEX_FILE": str(indice)}
+    try:
+        _git(repo, "read-tree", "--empty", env=env)
+        # no índice vazio só conta o que existe no disco (apagado fica de fora)
+        _git(repo, "add", "-A", "--", *_caminhos_existentes(repo, caminhos, env), env=env)
+        return _git(repo, "write-tree", env=env).stdout.strip()
+    finally:
+        indice.unlink(missing_ok=True)
+
+
+def _ponta(repo: Path, ref: str) -> str:
+    return _git(repo, "rev-parse", "--verify", "--quiet", ref, check=False).stdout.strip()
+
+
+def _commit_ramo_enxuto(repo: Path, mensagem: str, caminhos, ramo: str) -> bool:
+    """
+    Commit em `ramo` com uma árvore que só tem `caminhos`, montada num
+    índice temporário — sem checkout e sem tocar no índice do repositório.
+    """
+    arvore = _arvore_enxuta(repo, caminhos, ramo)
+    pai = _ponta(repo, f"refs/heads/{ramo}")
+    if pai and _git(repo, "rev-parse", f"{pai}^{{tree}}").stdout.strip() == arvore:
+        return False
+
+    commit = _git(repo, "commit-tree", arvore, *(["-p", pai] if pai else []), "-m", mensagem).stdout.strip()
+    _git(repo, "update-ref", f"refs/heads/{ramo}", commit, *([pai] if pai else []))
+    return True
+
+
+def publicar_git(repo: Path, mensagem: str = MENSAGEM_COMMIT, remoto: str = REMOTO, ramo: str = RAMO,
+                 caminhos=None, ramo_publicacao=None) -> bool:
+    """
+    add + commit + push síncrono só dos KPIs (CAMINHOS_PUBLICADOS), no ramo
+    atual ou no RAMO_PUBLICACAO. Sem mudança não há commit, mas o push roda
+    mesmo assim (envia um commit que ficou para trás numa falha anterior).
+    Devolve True se criou commit; erro do git vira RuntimeError.
+    """
+    caminhos = _caminhos_existentes(repo, caminhos or CAMINHOS_PUBLICADOS)
+    ramo_publicacao = ramo_publicacao or RAMO_PUBLICACAO
+
+    if ramo_publicacao:
+        novo_commit = _commit_ramo_enxuto(repo, mensagem, caminhos, ramo_publicacao)
+        _git(repo, "push", remoto, ramo_publicacao)
+    else:
+        novo_commit = _commit_escopo(repo, mensagem, caminhos)
+        _git(repo, "push", remoto, ramo)
+    return novo_commit
+
+
+def ha_o_que_publicar(repo: Path, remoto: str = REMOTO, ramo: str = RAMO,
+                      caminhos=None, ramo_publicacao=None) -> bool:
+    """
+    Pelo estado do git, não pelo que a última execução gravou: KPIs
+    alterados sem commit, ou commit que ainda não chegou em remoto/ramo
+    (push com falha, --no-push, atualização cancelada antes de publicar).
+    """
+    try:
+        caminhos = _caminhos_existentes(repo, caminhos or CAMINHOS_PUBLICADOS)
+    except FileNotFoundError:
+        caminhos = []
+    ramo_publicacao = ramo_publicacao or RAMO_PUBLICACAO
+
+    if ramo_publicacao:
+        ramo = ramo_publicacao
+        if caminhos:
+            ponta = _ponta(repo, f"refs/heads/{ramo}")
+            arvore = _arvore_enxuta(repo, caminhos, ramo)
+            if not ponta or _git(repo, "rev-parse", f"{ponta}^{{tree}}").stdout.strip() != arvore:
+                return True
+    elif caminhos and _git(repo, "status", "--porcelain", "--", *caminhos).stdout.strip():
+        return True
+
+    local = _ponta(repo, f"refs/heads/{ramo}")
+    if not local:
+        return False            # nada commitado ainda nesse ramo
+    publicado = _ponta(repo, f"refs/remotes/{remoto}/{ramo}")
+    if not publicado:
+        return True             # ramo nunca enviado
+    return _git(repo, "rev-list", "--count", f"{publicado}..{local}").stdout.strip() != "0"
+
+
+# ==========================================================
+# FILA + THREAD
+# ==========================================================
+_cond = threading.Condition()
+_thread = None
+_pedido = None            # (repo, mensagem) mais recente; pedidos novos substituem o anterior
+_pedido_em = 0.0
+_estado = {
+    "pendente": False,
+    "publicando": False,
+    "pedidos_agrupados": 0,
+    "tentativa": 0,
+    "proxima_tentativa": None,
+    "ultimo_sucesso": None,
+    "ultimo_erro": None,
+}
+
+
+def solicitar_publicacao(repo: Path, mensagem: str = MENSAGEM_COMMIT):
+    """Enfileira uma publicação e volta na hora."""
+    global _thread, _pedido, _pedido_em
+    with _cond:
+        _pedido = (Path(repo), mensagem)
+        _pedido_em = time.monotonic()
+        _estado["pendente"] = True
+        _estado["pedidos_agrupados"] += 1
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_trabalhador, name="publicador", daemon=True)
+            _thread.start()
+        _cond.notify_all()
+
+
+def status() -> dict:
+    with _cond:
+        return dict(_estado)
+
+
+def aguardar(timeout: float = None) -> bool:
+    """Espera a fila esvaziar. Devolve False se o tempo acabou antes."""
+    with _cond:
+        return _cond.wait_for(lambda: not _estado["pendente"], timeout)
+
+
+def _pegar_pedido():
+    """Chamado com o lock: entrega o pedido atual e limpa a fila."""
+    global _pedido
+    pedido, _pedido = _pedido, None
+    _estado["pedidos_agrupados"] = 0
+    return pedido
+
+
+def _trabalhador():
+    while True:
+        with _cond:
+            _cond.wait_for(lambda: _pedido is not None)
+            # agrupa a rajada: espera JANELA_AGRUPAR sem pedido novo
+            while (resta := _pedido_em + JANELA_AGRUPAR - time.monotonic()) > 0:
+                _cond.wait(resta)
+            repo, mensagem = _pegar_pedido()
+            _estado["publicando"] = True
+
+        tentativa = 0
+        while True:
+            try:
+                novo_commit = publicar_git(repo, mensagem)
+            except Exception as e:
+                tentativa += 1
+                espera = min(ESPERA_INICIAL * 2 ** (tentativa - 1), ESPERA_MAXIMA)
+                with _cond:
+                    _estado["tentativa"] = tentativa
+                    _estado["ultimo_erro"] = {
+                        "quando": _agora(), "momento": time.time(), "erro": str(e), "tentativa": tentativa,
+                    }
+                    if tentativa >= MAX_TENTATIVAS:
+                        break
+                    _estado["proxima_tentativa"] = time.time() + espera
+                    _cond.wait_for(lambda: time.time() >= _estado["proxima_tentativa"], espera)
+                    # pedido que chegou durante a espera entra nesta mesma tentativa
+                    if _pedido is not None:
+                        repo, mensagem = _pegar_pedido()
+                continue
+
+            with _cond:
+                _estado["tentativa"] = 0
+                _estado["ultimo_sucesso"] = {
+                    "quando": _agora(), "momento": time.time(), "commit": novo_commit,
+                }
+            break
+
+        with _cond:
+            _estado["publicando"] = False
+            _estado["proxima_tentativa"] = None
+            _estado["pendente"] = _pedido is not None
+            _cond.notify_all()
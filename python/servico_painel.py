@@ -0,0 +1,280 @@
+# ===============================================================
+# SERVIÇO RESIDENTE DO PAINEL (opcional)
+# ---------------------------------------------------------------
+# Processo que fica aberto com o cálculo importado e as planilhas
+# tratadas em memória. Cada atualização só relê as planilhas cujo
+# arquivo mudou (ver carregar_anos) e reaproveita os índices.
+#
+#   python python/servico_painel.py            → sobe o serviço
+#   python python/servico_painel.py --status
+#   python python/servico_painel.py --parar
+#
+# Os pontos de entrada (interface, robô, .bat) usam atualizar() e
+# previa() daqui: com o serviço no ar o trabalho vai para ele; sem
+# ele, roda no próprio processo como antes. Este arquivo não importa
+# pandas — o cliente continua leve.
+# ===============================================================
+
+import argparse
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+
+def _pasta_do_usuario() -> Path:
+    """Pasta só do usuário: %LOCALAPPDATA% no Windows, XDG_RUNTIME_DIR ou ~/.cache fora dele."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "painel_comercial"
+
+
+# endereço (porta livre escolhida pelo sistema) + chave de acesso do
+# serviço no ar. Fica na pasta do usuário, não no temp compartilhado:
+# o cliente confia no arquivo e recebe pickles do endereço que ele
+# aponta, então outro usuário não pode conseguir plantá-lo
+ARQ_SERVICO = _pasta_do_usuario() / "servico.json"
+
+
+class ServicoIndisponivel(Exception):
+    """Nenhum serviço respondendo — quem chamou roda no próprio processo."""
+
+
+# ===============================================================
+# CLIENTE
+# ===============================================================
+
+def _conectar():
+    try:
+        with open(ARQ_SERVICO, "r", encoding="utf-8") as f:
+            # onde há dono de arquivo (fora do Windows), só vale o do próprio usuário
+            if hasattr(os, "getuid") and os.fstat(f.fileno()).st_uid != os.getuid():
+                raise PermissionError(f"{ARQ_SERVICO} é de outro usuário")
+            info = json.load(f)
+        return Client(tuple(info["endereco"]), authkey=bytes.fromhex(info["chave"]))
+    except Exception as e:
+        raise ServicoIndisponivel(str(e)) from e
+
+
+def pedir(comando: dict, progresso=None, cancelar=None):
+    """
+    Envia um comando ao serviço e devolve a resposta. Mensagens de etapa
+    vão para progresso(); se cancelar() der True, o serviço é avisado e
+    para antes da próxima etapa (AtualizacaoCancelada, como no main()).
+    """
+    conn = _conectar()
+    try:
+        conn.send(comando)
+        cancelou = False
+        while True:
+            if cancelar is not None and not cancelou and cancelar():
+                conn.send("cancelar")
+                cancelou = True
+            if not conn.poll(0.1):
+                continue
+
+            tipo, *valor = conn.recv()
+            if tipo == "etapa":
+                if progresso is not None:
+                    progresso(valor[0])
+            elif tipo == "ok":
+                return valor[0]
+            elif tipo == "cancelado":
+                import atualizar_painel_completo as painel
+                raise painel.AtualizacaoCancelada(valor[0])
+            else:
+                raise RuntimeError(f"serviço do painel — {valor[0]}: {valor[1]}")
+    except (EOFError, ConnectionError) as e:
+        raise RuntimeError(f"serviço do painel caiu durante o pedido: {e}") from e
+    finally:
+        conn.close()
+
+
+def servico_no_ar() -> bool:
+    try:
+        pedir({"comando": "status"})
+        return True
+    except ServicoIndisponivel:
+        return False
+
+
+def atualizar(data_inicio=None, data_fim=None, recarregar=False, publicar=True,
+              progresso=None, cancelar=None) -> dict:
+    """main() no serviço residente se ele estiver no ar; senão, neste processo."""
+    argumentos = {
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+        "recarregar": recarregar,
+        "publicar": publicar,
+    }
+    try:
+        return pedir({"comando": "atualizar", **argumentos}, progresso, cancelar)
+    except ServicoIndisponivel:
+        import atualizar_painel_completo as painel
+        return painel.main(**argumentos, progresso=progresso, cancelar=cancelar)
+
+
+def previa(data_inicio, data_fim) -> dict:
+    """painel.previa() no serviço residente se ele estiver no ar; senão, aqui."""
+    try:
+        return pedir({"comando": "previa", "data_inicio": data_inicio, "data_fim": data_fim})
+    except ServicoIndisponivel:
+        import atualizar_painel_completo as painel
+        return painel.previa(data_inicio, data_fim)
+
+
+# ===============================================================
+# SERVIDOR
+# ===============================================================
+
+_lock_trabalho = threading.Lock()   # um main() por vez
+_estado = {"pid": os.getpid(), "desde": None, "atualizacoes": 0, "ultima": None}
+
+
+def _cancelar_por(conn):
+    """cancelar() para o main(): olha se o cliente mandou "cancelar"."""
+    pedido = {"cancelar": False}
+
+    def cancelar():
+        while not pedido["cancelar"] and conn.poll():
+            pedido["cancelar"] = conn.recv() == "cancelar"
+        return pedido["cancelar"]
+
+    return cancelar
+
+
+def _executar(painel, comando: dict, conn):
+    nome = comando.get("comando")
+
+    if nome == "status":
+        return {
+            **_estado,
+            "anos_em_memoria": sorted(
+                ano for ano, caminho in painel.descobrir_planilhas().items() if caminho in painel._DATASETS
+            ),
+            "memoria_mb": painel.memoria_em_uso(),
+        }
+
+    if nome == "previa":
+        return painel.previa(comando["data_inicio"], comando["data_fim"])
+
+    if nome == "atualizar":
+        with _lock_trabalho:
+            resultado = painel.main(
+                comando.get("data_inicio"),
+                comando.get("data_fim"),
+                recarregar=comando.get("recarregar", False),
+                publicar=comando.get("publicar", True),
+                progresso=lambda etapa: conn.send(("etapa", etapa)),
+                cancelar=_cancelar_por(conn),
+                medir=comando.get("medir"),
+            )
+        _estado["atualizacoes"] += 1
+        _estado["ultima"] = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        return resultado
+
+    raise ValueError(f"comando desconhecido: {nome!r}")
+
+
+def _atender(painel, conn, comando: dict):
+    try:
+        try:
+            conn.send(("ok", _executar(painel, comando, conn)))
+        except painel.AtualizacaoCancelada as e:
+            conn.send(("cancelado", str(e)))
+        except Exception as e:
+            conn.send(("erro", type(e).__name__, str(e)))
+    except (EOFError, OSError):
+        pass   # cliente foi embora no meio do pedido
+    finally:
+        conn.close()
+
+
+def _gravar_info(info: dict):
+    """Grava ARQ_SERVICO legível só pelo dono (a chave dá acesso ao serviço)."""
+    ARQ_SERVICO.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # nome imprevisível e O_EXCL: nunca abre um arquivo que outro criou antes
+    tmp = ARQ_SERVICO.with_name(f".{ARQ_SERVICO.name}.{os.getpid()}-{secrets.token_hex(8)}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        os.replace(tmp, ARQ_SERVICO)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def servir(aquecer: bool = True):
+    """Sobe o serviço e atende até receber "parar"."""
+    if servico_no_ar():
+        print(f"Serviço do painel já está no ar ({ARQ_SERVICO}).")
+        return
+
+    import atualizar_painel_completo as painel
+
+    chave = secrets.token_bytes(32)
+    listener = Listener(("127.0.0.1", 0), authkey=chave)
+    info = {"endereco": list(listener.address), "chave": chave.hex(), "pid": os.getpid()}
+    _gravar_info(info)
+    _estado["desde"] = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    print(f"Serviço do painel no ar em {listener.address[0]}:{listener.address[1]} (pid {os.getpid()}).")
+
+    if aquecer:
+        # deixa as planilhas e os índices prontos para o primeiro pedido
+        t0 = time.perf_counter()
+        catalogo = painel.descobrir_planilhas()
+        if catalogo:
+            ultimo = max(catalogo)
+            painel.previa(f"01/01/{ultimo}", f"31/12/{ultimo}", catalogo)
+        print(f"Planilhas em memória em {time.perf_counter() - t0:.2f}s.")
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+                comando = conn.recv()   # pedido pequeno, enviado logo após conectar
+            except Exception:
+                continue   # chave errada / conexão quebrada
+            if comando.get("comando") == "parar":
+                conn.send(("ok", True))
+                conn.close()
+                break
+            threading.Thread(target=_atender, args=(painel, conn, comando), daemon=True).start()
+    finally:
+        listener.close()
+        try:
+            with open(ARQ_SERVICO, "r", encoding="utf-8") as f:
+                if json.load(f).get("pid") == os.getpid():
+                    ARQ_SERVICO.unlink()
+        except Exception:
+            pass
+        print("Serviço do painel encerrado.")
+
+
+# ===============================================================
+# EXECUÇÃO
+# ===============================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço residente do painel comercial")
+    parser.add_argument("--status", action="store_true", help="mostra o estado do serviço no ar")
+    parser.add_argument("--parar", action="store_true", help="encerra o serviço no ar")
+    parser.add_argument("--sem-aquecer", action="store_true", help="não carrega as planilhas ao subir")
+    args = parser.parse_args()
+
+    if args.status or args.parar:
+        try:
+            resposta = pedir({"comando": "parar" if args.parar else "status"})
+        except ServicoIndisponivel:
+            print("Serviço do painel não está no ar.")
+            sys.exit(1)
+        print("Serviço encerrado." if args.parar else json.dumps(resposta, ensure_ascii=False, indent=2))
+    else:
+        servir(aquecer=not args.sem_aquecer)
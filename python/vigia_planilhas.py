@@ -0,0 +1,127 @@
+# ===============================================================
+# VIGIA DAS PLANILHAS — recalcula o painel sozinho
+# ---------------------------------------------------------------
+# Varre excel/ a cada INTERVALO_VARREDURA segundos (polling: funciona
+# em qualquer disco, inclusive pasta de rede) e, quando alguma
+# PEDIDOS_<AAAA>.xlsx muda:
+#   • espera ESPERA_SILENCIO sem nenhuma alteração (rajada de saves)
+#   • espera o arquivo estar inteiro e sem trava do Excel
+#   • no máximo um recálculo a cada INTERVALO_MINIMO segundos
+# e então atualiza + publica (serviço residente, se estiver no ar).
+#
+#   python python/vigia_planilhas.py
+# ===============================================================
+
+import os
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import atualizar_painel_completo as painel
+import servico_painel
+
+INTERVALO_VARREDURA = 2.0
+ESPERA_SILENCIO = 10.0
+INTERVALO_MINIMO = 60.0
+
+
+def log(mensagem: str):
+    print(f"[{datetime.now():%d/%m/%Y %H:%M:%S}] {mensagem}", flush=True)
+
+
+# ===============================================================
+# ESTADO DOS ARQUIVOS
+# ===============================================================
+
+def fotografar(pasta: Path) -> dict:
+    """{caminho: (tamanho, mtime_ns)} das planilhas do catálogo."""
+    foto = {}
+    for caminho in painel.descobrir_planilhas(pasta).values():
+        try:
+            st = os.stat(caminho)
+        except FileNotFoundError:
+            continue   # apagada/renomeada entre o listdir e o stat (save do Excel)
+        foto[caminho] = (st.st_size, st.st_mtime_ns)
+    return foto
+
+
+def planilha_pronta(caminho: Path) -> bool:
+    """Arquivo inteiro (zip válido) e sem trava de escrita do Excel."""
+    if (caminho.parent / f"~${caminho.name}").exists():
+        return False
+    try:
+        if not zipfile.is_zipfile(caminho):
+            return False
+        # no Windows o Excel com o arquivo aberto impede abrir para escrita
+        with open(caminho, "r+b"):
+            pass
+    except OSError:
+        return False
+    return True
+
+
+# ===============================================================
+# LAÇO PRINCIPAL
+# ===============================================================
+
+def vigiar(pasta: Path = None, atualizar=None, parar=None):
+    """
+    Roda até parar() devolver True (ou Ctrl+C). atualizar() é chamado a
+    cada recálculo; o padrão é servico_painel.atualizar (atualiza e publica).
+    """
+    pasta = Path(pasta or painel.EXCEL_DIR)
+    atualizar = atualizar or servico_painel.atualizar
+    parar = parar or (lambda: False)
+
+    foto = fotografar(pasta)
+    mudados = set()
+    mudou_em = None                 # última alteração vista (monotonic)
+    ultimo_recalculo = float("-inf")
+    aguardando_trava = False
+
+    log(f"Vigiando {pasta} ({len(foto)} planilhas). Ctrl+C para sair.")
+    while not parar():
+        time.sleep(INTERVALO_VARREDURA)
+        agora = time.monotonic()
+
+        nova = fotografar(pasta)
+        if nova != foto:
+            mudados |= {c for c in nova.keys() | foto.keys() if nova.get(c) != foto.get(c)}
+            foto = nova
+            mudou_em = agora
+            continue
+
+        if mudou_em is None or agora - mudou_em < ESPERA_SILENCIO:
+            continue
+        if agora - ultimo_recalculo < INTERVALO_MINIMO:
+            continue
+
+        existentes = [c for c in mudados if c in foto]
+        if not all(planilha_pronta(c) for c in existentes):
+            if not aguardando_trava:
+                log("Planilha aberta/gravando no Excel — aguardando liberar...")
+                aguardando_trava = True
+            continue
+        aguardando_trava = False
+
+        log("Alteração em " + ", ".join(sorted(c.name for c in mudados)) + " — recalculando...")
+        mudados.clear()
+        mudou_em = None
+        ultimo_recalculo = agora
+        try:
+            t0 = time.perf_counter()
+            resultado = atualizar()
+            alterados = resultado.get("alterados") or []
+            log(f"Painel recalculado em {time.perf_counter() - t0:.1f}s — "
+                + (f"{len(alterados)} arquivo(s) alterado(s), push: {resultado.get('push')}"
+                   if alterados else "nenhum KPI mudou"))
+        except Exception as e:
+            log(f"Erro ao recalcular: {e}")
+
+
+if __name__ == "__main__":
+    try:
+        vigiar()
+    except KeyboardInterrupt:
+        log("Vigia encerrado.")
@@ -192,8 +192,9 @@ def atualizar_excel(texto):
 
 def atualizar_painel():
     print("➡️ Atualizando painel...")
-    import atualizar_painel_completo as painel
-    painel.main()
+    # vai para o serviço residente se estiver no ar; senão roda aqui
+    import servico_painel
+    servico_painel.atualizar()
 
 
 # ===============================================================